@@ -1,3 +1,5 @@
+const fs = require("fs");
+
 module.exports = function(eleventyConfig) {
   
   // Ignore unnecessary directories and files
@@ -19,6 +21,41 @@ module.exports = function(eleventyConfig) {
   // Register responsive image shortcode
   eleventyConfig.addAsyncShortcode("responsiveImage", require("./_includes/shortcodes/responsiveImage.js"));
   
+  // Give post headings the ids their table of contents links to. The TOC
+  // data comes from scripts/generate_toc.py (_data/toc.json, also available
+  // to templates as `toc`); missing_ids lists one id per heading element of
+  // the post, in order, or null where the heading needs none. It is read
+  // before every build so `eleventy --serve` picks up a regenerated file.
+  let tocData = {};
+  eleventyConfig.on("eleventy.before", () => {
+    try {
+      tocData = JSON.parse(fs.readFileSync("./_data/toc.json", "utf8"));
+    } catch (e) {
+      // No TOC data generated yet
+      tocData = {};
+    }
+  });
+  eleventyConfig.addTransform("headingIds", function(content) {
+    const toc = tocData[this.page.url];
+    if (!toc || !toc.missing_ids) {
+      return content;
+    }
+    const start = content.indexOf('<article class="blog-post">');
+    const end = content.lastIndexOf("</article>");
+    if (start === -1 || end < start) {
+      return content;
+    }
+    let index = 0;
+    const article = content.slice(start, end).replace(/<h([1-6])\b([^>]*)>/gi, (tag, level, attrs) => {
+      const id = toc.missing_ids[index++];
+      if (!id || /\sid\s*=/i.test(attrs)) {
+        return tag;
+      }
+      return `<h${level}${attrs} id="${id}">`;
+    });
+    return content.slice(0, start) + article + content.slice(end);
+  });
+  
   // Add date filter for formatting dates
   eleventyConfig.addFilter("formatDate", (date, format) => {
     const d = new Date(date);
@@ -50,6 +87,8 @@ module.exports = function(eleventyConfig) {
   eleventyConfig.addPassthroughCopy("site.webmanifest");
   eleventyConfig.addPassthroughCopy("robots.txt");
   eleventyConfig.addPassthroughCopy("sitemap.xml");
+  eleventyConfig.addPassthroughCopy("sitemap_index.xml");  // Only with generate_sitemap.py --sharded
+  eleventyConfig.addPassthroughCopy("sitemap-*.xml.gz");
   eleventyConfig.addPassthroughCopy("_redirects");
   eleventyConfig.addPassthroughCopy("_headers");
 
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Run the accessibility, heading hierarchy and structured data audits in one pass.
+
+The built site is split into shards that a process pool audits in
+parallel. Each page is parsed once and handed to every checker, and the
+per-file results are merged back in sorted file order, so the reports
+match what the individual scripts print for the same files. Results are
+stored in the .cache/ audit store, so unchanged pages are not re-parsed.
+
+Usage:
+    uv run python scripts/audit.py [path] [--jobs N] [--no-cache]
+
+    # Audit the built site on every core
+    uv run python scripts/audit.py _site/
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import check_accessibility
+import check_heading_hierarchy
+import validate_schema
+from audit_cache import AuditCache
+from html_document import HtmlDocument, load_document
+from instrumentation import add_arguments, instrumented, phase
+from validate_schema import SchemaValidator
+
+# Shards per worker, so uneven page sizes still balance across the pool
+SHARDS_PER_JOB = 4
+
+
+def validate_schema_document(document: HtmlDocument) -> tuple:
+    """Schema messages for one page as (errors, warnings, successes)."""
+    validator = SchemaValidator()
+    validator.validate_document(document)
+    return validator.errors, validator.warnings, validator.successes
+
+
+def run_checks(html_file: Path, cache: Optional[AuditCache]) -> Dict:
+    """Run every checker on a page, from the audit cache when possible."""
+    checks = {
+        'accessibility': (
+            check_accessibility.CHECKER_VERSION,
+            check_accessibility.cacheable_check,
+        ),
+        'headings': (
+            check_heading_hierarchy.CHECKER_VERSION,
+            check_heading_hierarchy.analyze_document,
+        ),
+        # Schema messages name the file, so the name is part of the key, and
+        # depend on the vocabulary, so its content hash is too
+        'schema': (
+            f"{validate_schema.CHECKER_VERSION}"
+            f":{validate_schema.vocabulary().digest[:12]}:{html_file.name}",
+            validate_schema_document,
+        ),
+    }
+    if cache is not None:
+        return cache.results_for(html_file, checks)
+
+    document = load_document(html_file)
+    return {name: compute(document) for name, (_, compute) in checks.items()}
+
+
+def audit_page(html_file: Path, cache: Optional[AuditCache] = None) -> Dict:
+    """Run every checker on one page, parsing it at most once."""
+    try:
+        results = run_checks(html_file, cache)
+    except Exception as e:
+        return {
+            'file': html_file,
+            'accessibility': {
+                'file': html_file,
+                'error': f"Parse error: {e}",
+                'issues': []
+            },
+            'headings': ([], [check_heading_hierarchy.issue(
+                'parse-error', f"⚠️  Could not parse file: {e}"
+            )]),
+            'schema': ([f"Error reading {html_file}: {e}"], [], []),
+        }
+
+    return {
+        'file': html_file,
+        'accessibility': {'file': html_file, **results['accessibility']},
+        'headings': results['headings'],
+        'schema': results['schema'],
+    }
+
+
+def audit_shard(html_files: List[Path], use_cache: bool = True) -> List[Dict]:
+    """Audit a contiguous shard of pages in one worker."""
+    if not use_cache:
+        return [audit_page(html_file) for html_file in html_files]
+    with AuditCache() as cache:
+        return [audit_page(html_file, cache) for html_file in html_files]
+
+
+def make_shards(html_files: List[Path], jobs: int) -> List[List[Path]]:
+    """Split the sorted file list into contiguous, order-preserving shards."""
+    count = max(1, min(len(html_files), jobs * SHARDS_PER_JOB))
+    size = -(-len(html_files) // count)
+    return [html_files[i:i + size] for i in range(0, len(html_files), size)]
+
+
+def run_audit(html_files: List[Path], jobs: int, use_cache: bool = True) -> List[Dict]:
+    """Audit all pages, in parallel when more than one job is requested."""
+    html_files = sorted(html_files)
+    if jobs <= 1 or len(html_files) <= 1:
+        return audit_shard(html_files, use_cache)
+
+    shards = make_shards(html_files, jobs)
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for shard_results in executor.map(
+            audit_shard, shards, [use_cache] * len(shards)
+        ):
+            results.extend(shard_results)
+    return results
+
+
+def print_reports(results: List[Dict]) -> SchemaValidator:
+    """Print the accessibility, heading and schema reports from merged results."""
+    check_accessibility.print_header()
+    print(f"Checking {len(results)} HTML files...\n")
+    check_accessibility.print_report([r['accessibility'] for r in results])
+    print()
+
+    print("Analyzing heading hierarchy in HTML files...\n")
+    print(f"Found {len(results)} HTML files to analyze\n")
+    print("=" * 80)
+    check_heading_hierarchy.report_results(
+        (r['file'], *r['headings']) for r in results
+    )
+
+    validator = SchemaValidator()
+    for result in results:
+        errors, warnings, successes = result['schema']
+        validator.errors.extend(errors)
+        validator.warnings.extend(warnings)
+        validator.successes.extend(successes)
+    validator.print_report()
+    return validator
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Run all HTML audits over the built site in parallel"
+    )
+    parser.add_argument(
+        "path",
+        nargs="?",
+        default="_site",
+        help="HTML file or directory to audit (default: _site)",
+    )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-check every page instead of reusing results from .cache/",
+    )
+    add_arguments(parser)
+    return parser.parse_args()
+
+
+def main():
+    """Main entry point."""
+    args = parse_args()
+    path = Path(args.path)
+
+    with instrumented(args, "audit"):
+        with phase("discover"):
+            if path.is_file():
+                html_files = [path]
+            elif path.is_dir():
+                html_files = list(path.rglob("*.html"))
+            else:
+                print(f"Error: {path} is not a valid file or directory")
+                sys.exit(1)
+
+        with phase("check"):
+            results = run_audit(html_files, args.jobs, not args.no_cache)
+        with phase("report"):
+            validator = print_reports(results)
+
+    # Exit with error code if there are errors
+    sys.exit(1 if validator.errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Persistent incremental result store for the audit scripts.
+
+Checker results are kept in SQLite under .cache/, keyed by
+(checker name, checker version, page content hash). A page whose bytes
+have not changed is answered from the store without being parsed; only
+changed pages are tokenized and re-checked. Bump a checker's version
+whenever its rules change so stale results are not reused.
+
+Usage:
+    from audit_cache import AuditCache
+
+    with AuditCache() as cache:
+        results = cache.results_for(path, {
+            'headings': (CHECKER_VERSION, analyze_document),
+        })
+"""
+
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from html_document import HtmlDocument, parse_document
+from instrumentation import phase
+
+CACHE_DIR = Path(".cache")
+CACHE_FILE = CACHE_DIR / "audit.sqlite"
+
+# checker name -> (checker version, function computing a JSON-safe result)
+Checks = Dict[str, Tuple[str, Callable[[HtmlDocument], Any]]]
+
+
+def read_page(path: Path) -> Tuple[str, str]:
+    """Read a page once, returning its content hash and decoded text."""
+    with phase("read"):
+        data = path.read_bytes()
+    return hashlib.sha256(data).hexdigest(), data.decode('utf-8')
+
+
+class AuditCache:
+    """SQLite store of checker results keyed by page content hash."""
+
+    def __init__(self, path: Path = CACHE_FILE):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Parallel audit workers share the file, so wait on locks and use WAL
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " checker TEXT NOT NULL,"
+            " version TEXT NOT NULL,"
+            " digest TEXT NOT NULL,"
+            " result TEXT NOT NULL,"
+            " PRIMARY KEY (checker, version, digest))"
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get(self, checker: str, version: str, digest: str) -> Optional[Any]:
+        """Stored result for a page hash, or None if it was never checked."""
+        row = self.conn.execute(
+            "SELECT result FROM results"
+            " WHERE checker = ? AND version = ? AND digest = ?",
+            (checker, version, digest),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, checker: str, version: str, digest: str, result: Any):
+        """Store the result of checking a page hash."""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+            (checker, version, digest, json.dumps(result)),
+        )
+
+    def results_for(self, path: Path, checks: Checks) -> Dict[str, Any]:
+        """Run checks on a page, answering unchanged pages from the store.
+
+        The page is parsed at most once, and only when at least one check
+        has no stored result for its current content.
+        """
+        digest, text = read_page(path)
+
+        results = {}
+        missing = []
+        for name, (version, _) in checks.items():
+            cached = self.get(name, version, digest)
+            if cached is None:
+                missing.append(name)
+            else:
+                results[name] = cached
+
+        if missing:
+            document = parse_document(text, path)
+            for name in missing:
+                version, compute = checks[name]
+                # Round-trip through JSON so fresh and cached results match
+                result = json.loads(json.dumps(compute(document)))
+                self.put(name, version, digest, result)
+                results[name] = result
+
+        return results
+
+    def close(self):
+        """Commit pending results and close the store."""
+        self.conn.commit()
+        self.conn.close()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for the scripts/ tooling on synthetic corpora.
+
+Each tool runs as a child process against corpora of increasing size
+(generated once with generate_corpus.py and kept under .cache/corpus/).
+Wall time, CPU time, pages/sec and peak RSS are recorded and appended to
+a JSON history, and each result is compared with the previous run of the
+same tool and corpus size so regressions are visible.
+
+Usage:
+    uv run python scripts/benchmark.py
+    uv run python scripts/benchmark.py --sizes 100 1000 10000 100000
+    uv run python scripts/benchmark.py --tools validate_schema check_accessibility
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from generate_corpus import commit_corpus, generate_corpus
+from generate_sitemap import SITE_DIR, run_git
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+CORPUS_DIR = Path(".cache/corpus")
+HISTORY_FILE = Path("tests/benchmark-history.json")
+DEFAULT_SIZES = [100, 1000, 10000]
+
+# Runs a script in-process and reports on exit its own peak RSS and the
+# largest peak among its children (worker pools, git). VmHWM is used for
+# the tool itself since it is reset by exec, whereas the runner's ru_maxrss
+# would also count the benchmark process it was forked from. The recorded
+# peak adds the two: forked workers share some pages with the tool, and
+# workers running alongside the largest are not counted, so for fan-out
+# tools it is an estimate rather than an exact total.
+PEAK_MARKER = "BENCHMARK_PEAK_KB="
+RUNNER = f"""
+import atexit, os, resource, runpy, sys
+
+def report_peak():
+    own = ''
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    own = line.split()[1]
+    except OSError:
+        pass
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    if sys.platform == 'darwin':
+        children //= 1024
+    sys.__stderr__.write('\\n{PEAK_MARKER}' + own + ' ' + str(children) + '\\n')
+
+atexit.register(report_peak)
+sys.argv = sys.argv[1:]
+sys.path.insert(0, os.path.dirname(sys.argv[0]))
+runpy.run_path(sys.argv[0], run_name='__main__')
+"""
+
+# Tool name -> argv (after the interpreter) for a corpus; runs with cwd=corpus
+TOOLS = {
+    "generate_sitemap": lambda corpus: [SCRIPTS_DIR / "generate_sitemap.py"],
+    "validate-content": lambda corpus: [
+        SCRIPTS_DIR / "validate-content.py", "--data-dir", "data"
+    ],
+    "validate_schema": lambda corpus: [SCRIPTS_DIR / "validate_schema.py", SITE_DIR],
+    "check_accessibility": lambda corpus: [
+        SCRIPTS_DIR / "check_accessibility.py", SITE_DIR, "--no-cache"
+    ],
+    "check_heading_hierarchy": lambda corpus: [
+        SCRIPTS_DIR / "check_heading_hierarchy.py", SITE_DIR, "--no-cache"
+    ],
+}
+
+
+def ensure_corpus(size: int) -> Path:
+    """Generate the corpus for a size unless it already exists."""
+    corpus = CORPUS_DIR / str(size)
+    if not (corpus / SITE_DIR).exists():
+        shutil.rmtree(corpus, ignore_errors=True)
+        print(f"Generating {size}-post corpus in {corpus}...")
+        generate_corpus(size, corpus)
+        commit_corpus(corpus)
+    check_corpus(corpus)
+    return corpus
+
+
+def check_corpus(corpus: Path):
+    """Exit unless the corpus's structured data validates clean.
+
+    A corpus with broken pages would time the tools' error paths instead
+    of the real site's structure.
+    """
+    process = subprocess.run(
+        [sys.executable, SCRIPTS_DIR / "validate_schema.py", SITE_DIR],
+        cwd=corpus,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    if process.returncode != 0:
+        print(f"❌ {corpus} has structured data errors "
+              f"(see validate_schema.py); delete it to regenerate", file=sys.stderr)
+        sys.exit(1)
+
+
+def parse_peak_rss_mb(stderr: bytes, usage) -> Tuple[float, float]:
+    """Peak RSS in MB of the tool and of its largest child, from the runner."""
+    own = children = None
+    for line in reversed(stderr.decode('utf-8', 'replace').splitlines()):
+        if line.startswith(PEAK_MARKER):
+            own, children = line[len(PEAK_MARKER):].split(" ")
+            break
+    if own:
+        return int(own) / 1024, int(children) / 1024
+    # No /proc (macOS): fall back to ru_maxrss, which is in bytes there
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return usage.ru_maxrss / scale, int(children or 0) / 1024
+
+
+def run_tool(argv: List, corpus: Path) -> Dict:
+    """Run one tool as a child process and measure it."""
+    # Start every run cold: no sitemap indexes or audit results from before
+    shutil.rmtree(corpus / ".cache", ignore_errors=True)
+
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-c", RUNNER, *map(str, argv)],
+        cwd=corpus,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    seconds = time.perf_counter() - start
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    cpu_seconds = (
+        (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+    )
+    own_mb, children_mb = parse_peak_rss_mb(process.stderr, after)
+    return {
+        "seconds": round(seconds, 4),
+        "cpu_seconds": round(cpu_seconds, 4),
+        "peak_rss_mb": round(own_mb + children_mb, 1),
+        "children_peak_rss_mb": round(children_mb, 1),
+        "returncode": process.returncode,
+    }
+
+
+def load_history(path: Path) -> List[Dict]:
+    """Load the benchmark history, or an empty one."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def previous_result(history: List[Dict], tool: str, size: int) -> Optional[Dict]:
+    """Most recent successful result for a tool and corpus size."""
+    for entry in reversed(history):
+        if entry["tool"] == tool and entry["size"] == size \
+                and entry.get("returncode", 0) == 0:
+            return entry
+    return None
+
+
+def format_change(current: float, previous: Optional[float]) -> str:
+    """Percentage change against the previous run, if there was one."""
+    if not previous:
+        return ""
+    change = (current - previous) / previous * 100
+    return f"{change:+.0f}%"
+
+
+def run_benchmarks(sizes: List[int], tools: List[str], history_file: Path):
+    """Benchmark every tool on every corpus size and record the results."""
+    history = load_history(history_file)
+    head = (run_git("rev-parse", "--short", "HEAD", timeout=5) or "").strip()
+    run_info = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": head or None,
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+    }
+
+    print(f"{'tool':<26}{'size':>8}{'pages/s':>11}{'seconds':>10}"
+          f"{'peak MB':>10}{'vs last':>9}")
+    print("-" * 74)
+
+    results = []
+    failures = 0
+    for size in sizes:
+        corpus = ensure_corpus(size)
+        pages = sum(1 for _ in (corpus / SITE_DIR).rglob("*.html"))
+        for tool in tools:
+            measured = run_tool(TOOLS[tool](corpus), corpus)
+            entry = {
+                **run_info,
+                "tool": tool,
+                "size": size,
+                "pages": pages,
+                **measured,
+            }
+            # Every tool exits 0 on a clean corpus; a failed run has no throughput
+            if measured["returncode"] != 0:
+                failures += 1
+                entry["pages_per_sec"] = None
+                print(f"{tool:<26}{size:>8}{'FAILED':>11}"
+                      f"  (exit {measured['returncode']})")
+                results.append(entry)
+                continue
+            entry["pages_per_sec"] = round(pages / measured["seconds"], 1)
+            previous = previous_result(history, tool, size)
+            change = format_change(
+                entry["seconds"], previous["seconds"] if previous else None
+            )
+            print(f"{tool:<26}{size:>8}{entry['pages_per_sec']:>11.1f}"
+                  f"{entry['seconds']:>10.2f}{entry['peak_rss_mb']:>10.1f}"
+                  f"{change:>9}")
+            results.append(entry)
+
+    history.extend(results)
+    history_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(history_file, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=2)
+    if failures:
+        print(f"\n❌ {failures} of {len(results)} runs failed; "
+              f"results appended to {history_file}")
+        sys.exit(1)
+    print(f"\n✅ {len(results)} results appended to {history_file}")
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark the scripts/ tooling")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help=f"Corpus sizes in posts (default: {' '.join(map(str, DEFAULT_SIZES))})",
+    )
+    parser.add_argument(
+        "--tools",
+        nargs="+",
+        choices=sorted(TOOLS),
+        default=list(TOOLS),
+        help="Tools to benchmark (default: all)",
+    )
+    parser.add_argument(
+        "--history",
+        type=Path,
+        default=HISTORY_FILE,
+        help=f"JSON history file to append results to (default: {HISTORY_FILE})",
+    )
+    return parser.parse_args()
+
+
+def main():
+    """Main entry point."""
+    args = parse_args()
+    run_benchmarks(args.sizes, args.tools, args.history)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,124 +4,384 @@ Comprehensive accessibility audit for HTML files.
 Checks WCAG 2.1 AA compliance for common issues.
 """
 
-import re
+import argparse
+import copy
 from pathlib import Path
-from collections import defaultdict
-from html.parser import HTMLParser
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
 
+from audit_cache import AuditCache
+from html_document import FragmentCache, HtmlDocument, load_document
+from instrumentation import add_arguments, instrumented, phase
+from report_formats import TopResults, add_format_argument, open_writer
 
-class AccessibilityChecker(HTMLParser):
-    """Parse HTML and check for accessibility issues."""
+# Bump when the checks change so cached results are not reused
+CHECKER_VERSION = "5"
+
+
+# Rule id -> label used in the issue breakdown
+RULES = {
+    'img-alt': "Missing alt attributes",
+    'empty-link': "Empty link (href='#') - should have meaningful destination",
+    'input-label': "Input field without a label",
+    'html-lang': "Missing lang attribute",
+    'page-title': "Missing or empty <title> tag",
+    'viewport': "Missing viewport meta tag for mobile accessibility",
+    'skip-link': "Missing skip link",
+    'main-landmark': "Missing main landmark",
+    'page-h1': "Missing h1",
+    'duplicate-id': "Duplicate element ids",
+    'dangling-label': "Label for= pointing at a missing id",
+    'dangling-aria': "aria-labelledby/describedby pointing at a missing id",
+    'dangling-fragment': "Link to a #fragment missing from the page",
+}
+
+# Fragments browsers resolve without a matching element
+IMPLICIT_FRAGMENTS = {'top'}
+
+# Tag name ('/name' for end tags) -> rules run on it, before and after </head>
+HEAD_TAG_RULES: Dict[str, List[Tuple[str, Callable]]] = defaultdict(list)
+BODY_TAG_RULES: Dict[str, List[Tuple[str, Callable]]] = defaultdict(list)
+# Rules run once per page, after every tag has been seen
+PAGE_RULES: List[Tuple[str, Callable]] = []
+
+# (chrome fingerprint, checker state) -> AccessibilityChecker holding the
+# tag rule results for that subtree
+_fragment_results = FragmentCache()
+
+
+def rule(rule_id: str, *tags: str, head_only: bool = False):
+    """Register a check under a rule id.
+
+    With tags, the check runs as check(checker, tag, attrs) on each matching
+    start tag (or end tag, written '/name'); head_only checks stop once the
+    document head is closed. Without tags, it runs as
+    check(checker, document) once per page. A check returns an issue
+    message or a (message, line) pair, a list of these, or None.
+    """
+    assert rule_id in RULES, f"Unknown rule id: {rule_id}"
+
+    def register(check):
+        if not tags:
+            PAGE_RULES.append((rule_id, check))
+        for tag in tags:
+            HEAD_TAG_RULES[tag].append((rule_id, check))
+            if not head_only:
+                BODY_TAG_RULES[tag].append((rule_id, check))
+        return check
+    return register
+
+
+class AccessibilityChecker:
+    """Check a parsed HtmlDocument for accessibility issues."""
     
     def __init__(self):
-        super().__init__()
         self.issues = []
         self.images = []
-        self.links = []
         self.headings = []
-        self.forms = []
-        self.in_nav = False
         self.has_skip_link = False
         self.has_main_landmark = False
         self.has_h1 = False
+        self.has_lang = False
+        self.has_title = False
+        self.has_viewport = False
+        self.open_labels = 0
+        # (id, type) of inputs that rely on a <label for> pointing at them
+        self.inputs_needing_label = []
+        self.rules = HEAD_TAG_RULES
+    
+    def report(self, rule_id: str, messages):
+        """Record the issue message(s) returned by a rule."""
+        if isinstance(messages, (str, tuple)):
+            messages = [messages]
+        for message in messages or ():
+            if isinstance(message, tuple):
+                message, line = message
+                self.issues.append({'rule': rule_id, 'message': message, 'line': line})
+            else:
+                self.issues.append({'rule': rule_id, 'message': message})
+    
+    def feed_document(self, document: HtmlDocument):
+        """Replay the document's tag events through the registered rules.
+
+        Shared chrome subtrees (nav, footer) are checked once per
+        fingerprint and their findings are merged into every page.
+        """
+        fragments = {first: (end, digest) for first, end, digest in document.fragments}
+        tags = document.tags
+        index = 0
+        while index < len(tags):
+            if index in fragments:
+                end, digest = fragments[index]
+                self.merge(self.check_fragment(tags[index:end], digest))
+                index = end
+            else:
+                self.feed_tag(tags[index])
+                index += 1
         
-    def handle_starttag(self, tag, attrs):
-        attrs_dict = dict(attrs)
-        
-        # Check images for alt text
-        if tag == 'img':
-            alt = attrs_dict.get('alt')
-            src = attrs_dict.get('src', 'unknown')
-            if alt is None:
-                self.issues.append(f"Missing alt attribute on image: {src}")
-            elif alt == '':
-                # Empty alt is OK for decorative images, but note it
-                pass
-            self.images.append((src, alt))
-        
-        # Check links
-        if tag == 'a':
-            href = attrs_dict.get('href')
-            if href and href == '#':
-                self.issues.append("Empty link (href='#') - should have meaningful destination")
-        
-        # Check headings
-        if tag in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
-            self.headings.append(tag)
-            if tag == 'h1':
-                self.has_h1 = True
-        
-        # Check for skip link
-        if tag == 'a' and attrs_dict.get('href') == '#main-content':
-            self.has_skip_link = True
-        
-        # Check for main landmark
-        if tag == 'main':
-            self.has_main_landmark = True
-        
-        # Check nav
-        if tag == 'nav':
-            self.in_nav = True
-        
-        # Check form inputs
-        if tag == 'input':
-            input_type = attrs_dict.get('type', 'text')
-            label_id = attrs_dict.get('id')
-            aria_label = attrs_dict.get('aria-label')
-            if input_type not in ['hidden', 'submit', 'button'] and not label_id and not aria_label:
-                self.issues.append(f"Input field missing id or aria-label: type={input_type}")
+        for rule_id, check in PAGE_RULES:
+            self.report(rule_id, check(self, document))
     
-    def handle_endtag(self, tag):
-        if tag == 'nav':
-            self.in_nav = False
+    def feed_tag(self, tag):
+        """Run the rules registered for one tag event."""
+        if tag.end:
+            if tag.name == 'head':
+                self.rules = BODY_TAG_RULES
+            for rule_id, check in self.rules.get('/' + tag.name, ()):
+                self.report(rule_id, check(self, tag.name, tag.attrs))
+        else:
+            if tag.name == 'body':
+                self.rules = BODY_TAG_RULES
+            for rule_id, check in self.rules.get(tag.name, ()):
+                self.report(rule_id, check(self, tag.name, tag.attrs))
+    
+    def check_fragment(self, tags, digest: str) -> 'AccessibilityChecker':
+        """Tag rule results for a chrome subtree, cached by fingerprint."""
+        key = (digest, self.rules is HEAD_TAG_RULES, self.open_labels)
+        fragment = _fragment_results.get(key)
+        if fragment is None:
+            fragment = AccessibilityChecker()
+            fragment.rules = self.rules
+            fragment.open_labels = self.open_labels
+            for tag in tags:
+                fragment.feed_tag(tag)
+            _fragment_results.put(key, fragment)
+        return fragment
+    
+    def merge(self, fragment: 'AccessibilityChecker'):
+        """Fold a subtree's results into this page's state."""
+        for name, value in vars(fragment).items():
+            if isinstance(value, bool):
+                setattr(self, name, getattr(self, name) or value)
+            elif isinstance(value, list):
+                # Copies: the fragment is cached and merged into other pages too
+                getattr(self, name).extend(copy.deepcopy(value))
+        # Counters and the active rule table continue from the subtree
+        self.open_labels = fragment.open_labels
+        self.rules = fragment.rules
+
+
+@rule('img-alt', 'img')
+def image_alt(checker, tag, attrs):
+    # Empty alt is OK for decorative images
+    alt = attrs.get('alt')
+    src = attrs.get('src', 'unknown')
+    checker.images.append((src, alt))
+    if alt is None:
+        return f"Missing alt attribute on image: {src}"
+
+
+@rule('empty-link', 'a')
+def empty_link(checker, tag, attrs):
+    if attrs.get('href') == '#':
+        return "Empty link (href='#') - should have meaningful destination"
+
+
+@rule('input-label', 'label')
+def open_label(checker, tag, attrs):
+    checker.open_labels += 1
+
+
+@rule('input-label', '/label')
+def close_label(checker, tag, attrs):
+    checker.open_labels = max(0, checker.open_labels - 1)
+
+
+@rule('input-label', 'input')
+def input_label(checker, tag, attrs):
+    """Inputs need an accessible name, not just an id.
+
+    An input counts as labelled with aria-label, aria-labelledby, an
+    enclosing <label>, or a <label for> anywhere on the page pointing at
+    its id. An id alone used to pass; now an id with no <label for> is
+    reported by require_input_label once the whole page has been seen.
+    """
+    input_type = attrs.get('type', 'text')
+    if (input_type in ['hidden', 'submit', 'button']
+            or attrs.get('aria-label') or attrs.get('aria-labelledby')
+            or checker.open_labels):
+        return None
+    if not attrs.get('id'):
+        return f"Input field missing id or aria-label: type={input_type}"
+    # Labelled only if some <label for> on the page points at the id
+    checker.inputs_needing_label.append((attrs['id'], input_type))
+
+
+@rule('input-label')
+def require_input_label(checker, document):
+    label_targets = {
+        reference.target for reference in document.references
+        if reference.attr == 'for'
+    }
+    return [
+        "Input field has no <label for> or aria-label: "
+        f"id={input_id}, type={input_type}"
+        for input_id, input_type in checker.inputs_needing_label
+        if input_id not in label_targets
+    ]
+
+
+@rule('duplicate-id')
+def duplicate_ids(checker, document):
+    return [
+        (f"Duplicate id '{element_id}' ({len(offsets)} elements, lines "
+         f"{', '.join(str(document.line_of(offset)) for offset in offsets)})",
+         document.line_of(offsets[1]))
+        for element_id, offsets in document.ids.items()
+        if len(offsets) > 1
+    ]
+
+
+@rule('dangling-label')
+def dangling_labels(checker, document):
+    return [
+        (f"<label for='{reference.target}'> points at a missing id "
+         f"(line {document.line_of(reference.offset)})",
+         document.line_of(reference.offset))
+        for reference in document.references
+        if reference.attr == 'for' and reference.target not in document.ids
+    ]
+
+
+@rule('dangling-aria')
+def dangling_aria(checker, document):
+    return [
+        (f"{reference.attr}='{reference.target}' points at a missing id "
+         f"(line {document.line_of(reference.offset)})",
+         document.line_of(reference.offset))
+        for reference in document.references
+        if reference.attr.startswith('aria-') and reference.target not in document.ids
+    ]
+
+
+@rule('dangling-fragment')
+def dangling_fragments(checker, document):
+    return [
+        (f"Link to '#{reference.target}' has no matching id on the page "
+         f"(line {document.line_of(reference.offset)})",
+         document.line_of(reference.offset))
+        for reference in document.references
+        if reference.attr == 'href'
+        and reference.target not in document.ids
+        and reference.target not in document.anchor_names
+        and reference.target.lower() not in IMPLICIT_FRAGMENTS
+    ]
+
+
+@rule('html-lang', 'html', head_only=True)
+def find_lang(checker, tag, attrs):
+    if attrs.get('lang') is not None:
+        checker.has_lang = True
+
+
+@rule('html-lang')
+def require_lang(checker, document):
+    if not checker.has_lang:
+        return "Missing lang attribute on <html> tag"
+
+
+@rule('page-title', 'title', head_only=True)
+def find_title(checker, tag, attrs):
+    checker.has_title = True
+
+
+@rule('page-title')
+def require_title(checker, document):
+    if not checker.has_title or not document.title:
+        return "Missing or empty <title> tag"
+
+
+@rule('viewport', 'meta', head_only=True)
+def find_viewport(checker, tag, attrs):
+    if (attrs.get('name') or '').lower() == 'viewport':
+        checker.has_viewport = True
+
+
+@rule('viewport')
+def require_viewport(checker, document):
+    if not checker.has_viewport:
+        return "Missing viewport meta tag for mobile accessibility"
+
+
+@rule('skip-link', 'a')
+def find_skip_link(checker, tag, attrs):
+    if attrs.get('href') == '#main-content':
+        checker.has_skip_link = True
+
+
+@rule('skip-link')
+def require_skip_link(checker, document):
+    if not checker.has_skip_link:
+        return "Missing skip to main content link (recommended for keyboard navigation)"
+
+
+@rule('main-landmark', 'main')
+def find_main_landmark(checker, tag, attrs):
+    checker.has_main_landmark = True
+
+
+@rule('main-landmark')
+def require_main_landmark(checker, document):
+    if not checker.has_main_landmark:
+        return "Missing <main> landmark (helps screen readers)"
+
+
+@rule('page-h1', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+def find_h1(checker, tag, attrs):
+    checker.headings.append(tag)
+    if tag == 'h1':
+        checker.has_h1 = True
+
+
+@rule('page-h1')
+def require_h1(checker, document):
+    if not checker.has_h1:
+        return "Missing h1 heading (every page should have one)"
 
 
 def check_file(filepath: Path) -> dict:
     """Check a single HTML file for accessibility issues."""
-    
-    with open(filepath, 'r', encoding='utf-8') as f:
-        html_content = f.read()
-    
-    checker = AccessibilityChecker()
     try:
-        checker.feed(html_content)
+        document = load_document(filepath)
     except Exception as e:
         return {
             'file': filepath,
             'error': f"Parse error: {e}",
             'issues': []
         }
-    
-    # Additional checks
-    issues = checker.issues.copy()
-    
-    # Check for lang attribute
-    if not re.search(r'<html[^>]*\slang=', html_content, re.IGNORECASE):
-        issues.append("Missing lang attribute on <html> tag")
-    
-    # Check for page title
-    if not re.search(r'<title>.*?</title>', html_content, re.IGNORECASE):
-        issues.append("Missing or empty <title> tag")
-    
-    # Check for viewport meta tag (mobile accessibility)
-    if not re.search(r'<meta[^>]*name=["\']viewport["\']', html_content, re.IGNORECASE):
-        issues.append("Missing viewport meta tag for mobile accessibility")
-    
-    # Check for skip link
-    if not checker.has_skip_link:
-        issues.append("Missing skip to main content link (recommended for keyboard navigation)")
-    
-    # Check for main landmark
-    if not checker.has_main_landmark:
-        issues.append("Missing <main> landmark (helps screen readers)")
-    
-    # Check for h1
-    if not checker.has_h1:
-        issues.append("Missing h1 heading (every page should have one)")
+    return check_document(document)
+
+
+def check_file_cached(filepath: Path, cache: AuditCache) -> dict:
+    """Check a file, answering unchanged content from the audit cache."""
+    try:
+        result = cache.results_for(filepath, {
+            'accessibility': (CHECKER_VERSION, cacheable_check),
+        })['accessibility']
+    except Exception as e:
+        return {
+            'file': filepath,
+            'error': f"Parse error: {e}",
+            'issues': []
+        }
+    return {'file': filepath, **result}
+
+
+def cacheable_check(document: HtmlDocument) -> dict:
+    """check_document() without the file path, for storing by content hash."""
+    result = check_document(document)
+    del result['file']
+    return result
+
+
+def check_document(document: HtmlDocument) -> dict:
+    """Check an already-parsed HTML document for accessibility issues."""
+    checker = AccessibilityChecker()
+    checker.feed_document(document)
     
     return {
-        'file': filepath,
-        'issues': issues,
+        'file': document.path,
+        'issues': checker.issues,
         'images': len(checker.images),
         'images_without_alt': len([img for img in checker.images if img[1] is None]),
         'headings': len(checker.headings),
@@ -129,14 +389,15 @@ def check_file(filepath: Path) -> dict:
     }
 
 
-def main():
-    """Main function."""
-    print("=" * 70)
-    print("ACCESSIBILITY AUDIT - WCAG 2.1 AA")
-    print("=" * 70)
-    print()
+def find_html_files(path: Path = None) -> list:
+    """Find the HTML files to audit.
+
+    With a path, that file or every HTML file under that directory is
+    used; otherwise the root pages and blog posts are.
+    """
+    if path is not None:
+        return [path] if path.is_file() else list(path.rglob('*.html'))
     
-    # Find all HTML files
     html_files = []
     
     # Root HTML files
@@ -149,28 +410,43 @@ def main():
     if blog_dir.exists():
         html_files.extend(blog_dir.glob('*.html'))
     
-    print(f"Checking {len(html_files)} HTML files...\n")
-    
-    # Check all files
-    all_results = []
+    return html_files
+
+
+def print_header():
+    """Print the audit banner."""
+    print("=" * 70)
+    print("ACCESSIBILITY AUDIT - WCAG 2.1 AA")
+    print("=" * 70)
+    print()
+
+
+def print_report(all_results):
+    """Print the summary, issue breakdown and worst files for checked results.
+
+    `all_results` may be a generator; it is consumed once and only the
+    worst files are kept in memory.
+    """
+    total_files = 0
     total_issues = 0
     files_with_issues = 0
-    
-    for html_file in sorted(html_files):
-        result = check_file(html_file)
-        all_results.append(result)
-        
+    rule_counts = Counter()
+    worst_files = TopResults(10)
+    for result in all_results:
+        total_files += 1
         if result.get('issues'):
             total_issues += len(result['issues'])
             files_with_issues += 1
+            rule_counts.update(issue['rule'] for issue in result['issues'])
+            worst_files.add(len(result['issues']), result)
     
     # Summary statistics
     print("=" * 70)
     print("SUMMARY")
     print("=" * 70)
-    print(f"Total files checked: {len(html_files)}")
+    print(f"Total files checked: {total_files}")
     print(f"Files with issues: {files_with_issues}")
-    print(f"Files passed: {len(html_files) - files_with_issues}")
+    print(f"Files passed: {total_files - files_with_issues}")
     print(f"Total issues found: {total_issues}")
     print()
     
@@ -180,25 +456,8 @@ def main():
         print("ISSUE BREAKDOWN")
         print("=" * 70)
         
-        issue_counts = defaultdict(int)
-        for result in all_results:
-            for issue in result.get('issues', []):
-                # Generalize issue for counting
-                if 'alt' in issue.lower():
-                    issue_counts['Missing alt attributes'] += 1
-                elif 'skip' in issue.lower():
-                    issue_counts['Missing skip link'] += 1
-                elif 'main' in issue.lower() and 'landmark' in issue.lower():
-                    issue_counts['Missing main landmark'] += 1
-                elif 'h1' in issue.lower():
-                    issue_counts['Missing h1'] += 1
-                elif 'lang' in issue.lower():
-                    issue_counts['Missing lang attribute'] += 1
-                else:
-                    issue_counts[issue] += 1
-        
-        for issue, count in sorted(issue_counts.items(), key=lambda x: -x[1]):
-            print(f"  • {issue}: {count} occurrence(s)")
+        for rule_id, count in sorted(rule_counts.items(), key=lambda x: -x[1]):
+            print(f"  • {RULES[rule_id]}: {count} occurrence(s)")
         print()
     
     # Files with most issues
@@ -207,21 +466,20 @@ def main():
         print("TOP 10 FILES WITH MOST ISSUES")
         print("=" * 70)
         
-        sorted_results = sorted(all_results, key=lambda x: len(x.get('issues', [])), reverse=True)
-        for result in sorted_results[:10]:
-            if result.get('issues'):
-                print(f"\n{result['file']} ({len(result['issues'])} issues):")
-                for issue in result['issues'][:5]:  # Show first 5 issues
-                    print(f"  • {issue}")
-                if len(result['issues']) > 5:
-                    print(f"  ... and {len(result['issues']) - 5} more")
+        for result in worst_files.items():
+            print(f"\n{result['file']} ({len(result['issues'])} issues):")
+            for issue in result['issues'][:5]:  # Show first 5 issues
+                print(f"  • {issue['message']}")
+            if len(result['issues']) > 5:
+                print(f"  ... and {len(result['issues']) - 5} more")
     
     print()
     print("=" * 70)
     if total_issues == 0:
         print("✅ ALL CHECKS PASSED!")
     else:
-        print(f"⚠️  Found {total_issues} accessibility issues across {files_with_issues} files")
+        print(f"⚠️  Found {total_issues} accessibility issues "
+              f"across {files_with_issues} files")
         print("\nRecommended actions:")
         print("  1. Add skip to main content links")
         print("  2. Ensure all images have alt text")
@@ -231,5 +489,70 @@ def main():
     print("=" * 70)
 
 
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="WCAG 2.1 AA accessibility audit")
+    parser.add_argument(
+        "path",
+        nargs="?",
+        type=Path,
+        help="HTML file or directory to check (default: root pages and blog posts)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-check every file instead of reusing results from .cache/",
+    )
+    add_format_argument(parser)
+    add_arguments(parser)
+    return parser.parse_args()
+
+
+def check_files(html_files: list, use_cache: bool = True):
+    """Yield one result per file, checking files in sorted order."""
+    if not use_cache:
+        for html_file in sorted(html_files):
+            with phase("check"):
+                result = check_file(html_file)
+            yield result
+        return
+    
+    with AuditCache() as cache:
+        for html_file in sorted(html_files):
+            with phase("check"):
+                result = check_file_cached(html_file, cache)
+            yield result
+
+
+def write_findings(results, fmt: str):
+    """Stream results as NDJSON records or a SARIF log."""
+    with open_writer(fmt, "check_accessibility", RULES) as writer:
+        for result in results:
+            fields = {key: value for key, value in result.items()
+                      if key not in ('file', 'issues')}
+            writer.write(result['file'], result['issues'], **fields)
+
+
+def main():
+    """Main function."""
+    args = parse_args()
+    with instrumented(args, "check_accessibility"):
+        # Find all HTML files
+        with phase("discover"):
+            html_files = find_html_files(args.path)
+        
+        # Check all files; results are reported as they arrive
+        all_results = check_files(html_files, not args.no_cache)
+        
+        with phase("report"):
+            if args.format != "text":
+                write_findings(all_results, args.format)
+                return
+            
+            print_header()
+            print(f"Checking {len(html_files)} HTML files...\n")
+            print_report(all_results)
+
+
 if __name__ == "__main__":
     main()
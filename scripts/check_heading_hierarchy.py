@@ -4,81 +4,142 @@ Check and report heading hierarchy issues in HTML files.
 Ensures proper semantic structure: one h1 per page, proper nesting.
 """
 
-import re
+import argparse
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import Callable, List, Dict, Optional, Tuple
+
+from audit_cache import AuditCache
+from html_document import HtmlDocument, load_document, parse_document
+from instrumentation import add_arguments, instrumented, phase
+from report_formats import add_format_argument, open_writer
+
+# Bump when the checks change so cached results are not reused
+CHECKER_VERSION = "4"
+
+# Rule id -> description, for structured output
+RULES = {
+    'no-headings': "Page has no headings",
+    'no-h1': "Page has no h1",
+    'multiple-h1': "Page has more than one h1",
+    'level-skip': "Heading levels should not be skipped",
+}
 
 
 def extract_headings(html_content: str, filepath: Path) -> List[Dict]:
     """Extract all heading tags and their levels from HTML content."""
-    # Match heading tags with their content
-    pattern = r'<h([1-6])[^>]*>(.*?)</h\1>'
-    matches = re.findall(pattern, html_content, re.DOTALL | re.IGNORECASE)
-    
-    headings = []
-    for level, content in matches:
-        # Clean up content (remove HTML tags, extra whitespace)
-        clean_content = re.sub(r'<[^>]+>', '', content)
-        clean_content = ' '.join(clean_content.split()).strip()
-        
-        if clean_content:  # Only include non-empty headings
-            headings.append({
-                'level': int(level),
-                'text': clean_content[:80]  # Truncate long headings
-            })
-    
-    return headings
+    return parse_document(html_content, filepath).headings
+
+
+def issue(rule_id: str, message: str, line: Optional[int] = None) -> Dict:
+    """An issue record carrying its rule id, and its line when known."""
+    record = {'rule': rule_id, 'message': message}
+    if line is not None:
+        record['line'] = line
+    return record
+
+
+def build_outline(headings: List[Dict]) -> List[Dict]:
+    """Nest headings into an outline tree in one pass.
 
+    Each node is {'level', 'text', 'offset', 'position', 'children'}; a
+    heading becomes a child of the nearest preceding heading with a lower
+    level. `position` is the 1-based index in document order.
+    """
+    roots = []
+    stack = []
+    for position, heading in enumerate(headings, 1):
+        node = {**heading, 'position': position, 'children': []}
+        while stack and stack[-1]['level'] >= node['level']:
+            stack.pop()
+        (stack[-1]['children'] if stack else roots).append(node)
+        stack.append(node)
+    return roots
 
-def check_hierarchy(headings: List[Dict]) -> List[str]:
-    """Check for heading hierarchy issues."""
+
+def walk_outline(nodes: List[Dict], parent: Dict = None):
+    """Yield (parent, node) for every node of an outline, in document order."""
+    for node in nodes:
+        yield parent, node
+        yield from walk_outline(node['children'], node)
+
+
+def check_hierarchy(headings: List[Dict],
+                    line_of: Callable[[int], int] = None) -> List[Dict]:
+    """Check the document outline for heading hierarchy issues.
+
+    With `line_of` (source offset -> line), issues about a particular
+    heading carry its line.
+    """
     issues = []
+    locate = line_of or (lambda offset: None)
     
     if not headings:
-        issues.append("No headings found")
+        issues.append(issue('no-headings', "No headings found"))
         return issues
     
+    outline = build_outline(headings)
+    
     # Check for h1
-    h1_count = sum(1 for h in headings if h['level'] == 1)
+    h1_nodes = [node for _, node in walk_outline(outline) if node['level'] == 1]
+    h1_count = len(h1_nodes)
     
     if h1_count == 0:
-        issues.append("⚠️  No h1 found")
+        issues.append(issue('no-h1', "⚠️  No h1 found"))
     elif h1_count > 1:
-        issues.append(f"⚠️  Multiple h1 tags ({h1_count} found) - should have exactly one")
+        issues.append(issue(
+            'multiple-h1',
+            f"⚠️  Multiple h1 tags ({h1_count} found) - should have exactly one",
+            locate(h1_nodes[1]['offset']),
+        ))
     
-    # Check for heading level skips
-    prev_level = 0
-    for i, heading in enumerate(headings):
-        level = heading['level']
-        
-        # Check if we skip levels (e.g., h1 -> h3)
-        if prev_level > 0 and level > prev_level + 1:
-            issues.append(
-                f"⚠️  Heading level skip at position {i+1}: "
-                f"h{prev_level} -> h{level} ('{heading['text']}')"
-            )
-        
-        prev_level = level
+    # Check for heading level skips: a section whose first subheading is
+    # more than one level deeper (e.g., h1 -> h3). Later siblings were
+    # already reported with the first one.
+    for parent, node in walk_outline(outline):
+        if parent is not None and node is parent['children'][0] \
+                and node['level'] > parent['level'] + 1:
+            issues.append(issue(
+                'level-skip',
+                f"⚠️  Heading level skip at position {node['position']}: "
+                f"h{parent['level']} -> h{node['level']} ('{node['text']}')",
+                locate(node['offset']),
+            ))
     
     return issues
 
 
-def analyze_file(html_file: Path) -> Tuple[List[Dict], List[str]]:
+def analyze_file(html_file: Path) -> Tuple[List[Dict], List[Dict]]:
     """Analyze a single HTML file for heading hierarchy."""
-    with open(html_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    headings = extract_headings(content, html_file)
-    issues = check_hierarchy(headings)
+    return analyze_document(load_document(html_file))
+
+
+def analyze_file_cached(
+    html_file: Path, cache: AuditCache
+) -> Tuple[List[Dict], List[Dict]]:
+    """Analyze a file, answering unchanged content from the audit cache."""
+    headings, issues = cache.results_for(html_file, {
+        'headings': (CHECKER_VERSION, analyze_document),
+    })['headings']
+    return headings, issues
+
+
+def analyze_document(document: HtmlDocument) -> Tuple[List[Dict], List[Dict]]:
+    """Analyze an already-parsed HTML document for heading hierarchy."""
+    headings = document.headings
+    issues = check_hierarchy(headings, document.line_of)
     
     return headings, issues
 
 
-def main():
-    """Main function."""
-    print("Analyzing heading hierarchy in HTML files...\n")
+def find_html_files(path: Path = None) -> List[Path]:
+    """Find the HTML files to analyze.
+
+    With a path, that file or every HTML file under that directory is
+    used; otherwise the root pages and blog posts are.
+    """
+    if path is not None:
+        return [path] if path.is_file() else list(path.rglob('*.html'))
     
-    # Find all HTML files
     html_files = []
     
     # Root HTML files (exclude css-demo.html and templates)
@@ -91,52 +152,43 @@ def main():
     if blog_dir.exists():
         html_files.extend(blog_dir.glob('*.html'))
     
-    print(f"Found {len(html_files)} HTML files to analyze\n")
-    print("="*80)
+    return html_files
+
+
+def print_file_result(html_file: Path, headings: List[Dict], issues: List[Dict]):
+    """Print the heading structure and issues of a file with issues."""
+    print(f"\n📄 {html_file}")
+    print(f"   Headings: {len(headings)}")
     
-    # Track statistics
-    total_issues = 0
-    files_with_issues = 0
-    perfect_files = []
+    # Show heading structure
+    if headings:
+        print(f"   Structure:")
+        for h in headings[:5]:  # Show first 5 headings
+            indent = "  " * (h['level'] - 1)
+            print(f"     {indent}h{h['level']}: {h['text']}")
+        if len(headings) > 5:
+            print(f"     ... ({len(headings) - 5} more)")
     
-    # Analyze each file
-    for html_file in sorted(html_files):
-        headings, issues = analyze_file(html_file)
-        
-        if issues:
-            files_with_issues += 1
-            total_issues += len(issues)
-            
-            print(f"\n📄 {html_file}")
-            print(f"   Headings: {len(headings)}")
-            
-            # Show heading structure
-            if headings:
-                print(f"   Structure:")
-                for h in headings[:5]:  # Show first 5 headings
-                    indent = "  " * (h['level'] - 1)
-                    print(f"     {indent}h{h['level']}: {h['text']}")
-                if len(headings) > 5:
-                    print(f"     ... ({len(headings) - 5} more)")
-            
-            # Show issues
-            print(f"\n   Issues:")
-            for issue in issues:
-                print(f"     {issue}")
-            print("-" * 80)
-        else:
-            perfect_files.append(html_file)
-    
-    # Summary
+    # Show issues
+    print(f"\n   Issues:")
+    for found in issues:
+        print(f"     {found['message']}")
+    print("-" * 80)
+
+
+def print_summary(total_files: int, files_with_issues: int,
+                  perfect_files: List[Path], total_issues: int):
+    """Print the summary and recommendations."""
     print(f"\n{'='*80}")
     print(f"SUMMARY")
     print(f"{'='*80}")
-    print(f"Total files analyzed: {len(html_files)}")
+    print(f"Total files analyzed: {total_files}")
     print(f"Files with issues: {files_with_issues}")
-    print(f"Files with perfect hierarchy: {len(perfect_files)}")
+    perfect_count = total_files - files_with_issues
+    print(f"Files with perfect hierarchy: {perfect_count}")
     print(f"Total issues found: {total_issues}")
     
-    if perfect_files and len(perfect_files) <= 10:
+    if perfect_files and perfect_count <= 10:
         print(f"\n✅ Perfect files:")
         for f in perfect_files:
             print(f"   {f}")
@@ -147,5 +199,98 @@ def main():
     print(f"   - Use h2 for main sections, h3 for subsections, etc.")
 
 
+def report_results(results) -> int:
+    """Print per-file results as they arrive, then the summary.
+
+    `results` yields (html_file, headings, issues) tuples. Returns the
+    total number of issues found. Only the first few perfect files are
+    kept, since they are listed only when there are at most 10.
+    """
+    total_files = 0
+    total_issues = 0
+    files_with_issues = 0
+    perfect_files = []
+    
+    for html_file, headings, issues in results:
+        total_files += 1
+        if issues:
+            files_with_issues += 1
+            total_issues += len(issues)
+            print_file_result(html_file, headings, issues)
+        elif len(perfect_files) < 10:
+            perfect_files.append(html_file)
+    
+    print_summary(total_files, files_with_issues, perfect_files, total_issues)
+    return total_issues
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Check heading hierarchy")
+    parser.add_argument(
+        "path",
+        nargs="?",
+        type=Path,
+        help="HTML file or directory to check (default: root pages and blog posts)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-analyze every file instead of reusing results from .cache/",
+    )
+    add_format_argument(parser)
+    add_arguments(parser)
+    return parser.parse_args()
+
+
+def analyze_files(html_files: List[Path], cache: AuditCache = None):
+    """Yield (html_file, headings, issues) for files in sorted order."""
+    for html_file in sorted(html_files):
+        with phase("check"):
+            if cache is None:
+                headings, issues = analyze_file(html_file)
+            else:
+                headings, issues = analyze_file_cached(html_file, cache)
+        yield html_file, headings, issues
+
+
+def write_findings(results, fmt: str):
+    """Stream (html_file, headings, issues) results as NDJSON or SARIF."""
+    with open_writer(fmt, "check_heading_hierarchy", RULES) as writer:
+        for html_file, headings, issues in results:
+            writer.write(html_file, issues, headings=headings)
+
+
+def report(args, results):
+    """Report results in the requested format as they arrive."""
+    if args.format != "text":
+        write_findings(results, args.format)
+    else:
+        report_results(results)
+
+
+def main():
+    """Main function."""
+    args = parse_args()
+    with instrumented(args, "check_heading_hierarchy"):
+        # Find all HTML files
+        with phase("discover"):
+            html_files = find_html_files(args.path)
+        
+        if args.format == "text":
+            print("Analyzing heading hierarchy in HTML files...\n")
+            print(f"Found {len(html_files)} HTML files to analyze\n")
+            print("="*80)
+        
+        # Analyze each file; results are reported as they arrive
+        if args.no_cache:
+            with phase("report"):
+                report(args, analyze_files(html_files))
+            return
+        
+        with AuditCache() as cache, phase("report"):
+            report(args, analyze_files(html_files, cache))
+
+
 if __name__ == '__main__':
     main()
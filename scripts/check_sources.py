@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Check the blog post sources in blog/posts-md for heading and accessibility
+issues, reporting each finding as `file.md:line`.
+
+The Markdown/Nunjucks source is tokenized directly. Its front matter is
+blanked out line for line, so every offset in the parsed document maps
+straight back to a line of the .md file. Only the checks that apply to a
+post body are run; the layout supplies the page h1, landmarks, skip link
+and <head>, which the built-site audit covers.
+
+With --changed, only posts that differ from a git revision (default HEAD,
+so staged and unstaged edits) and untracked posts are checked, which keeps
+a pre-commit run well under a second.
+
+Usage:
+    uv run python scripts/check_sources.py [post.md ...] [--changed [REV]]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+import check_heading_hierarchy
+from check_accessibility import (
+    BODY_TAG_RULES,
+    PAGE_RULES,
+    RULES as ACCESSIBILITY_RULES,
+    AccessibilityChecker,
+)
+from generate_sitemap import POSTS_DIR, read_front_matter, run_git
+from generate_toc import build_toc, layout_ids, markdown_headings, split_body
+from html_document import HtmlDocument, parse_document
+from instrumentation import add_arguments, instrumented, phase
+from report_formats import add_format_argument, open_writer
+
+# Page-level accessibility rules the post layout takes care of
+LAYOUT_RULES = {
+    'html-lang', 'page-title', 'viewport', 'skip-link', 'main-landmark', 'page-h1',
+}
+
+# Rule id -> description, for structured output
+RULES = {
+    **check_heading_hierarchy.RULES,
+    **{rule_id: label for rule_id, label in ACCESSIBILITY_RULES.items()
+       if rule_id not in LAYOUT_RULES},
+    'parse-error': "File could not be read",
+}
+
+
+class SourceChecker(AccessibilityChecker):
+    """AccessibilityChecker for a post body that records issue lines."""
+
+    def __init__(self, document: HtmlDocument):
+        super().__init__()
+        self.document = document
+        # Post bodies are rendered inside <body>
+        self.rules = BODY_TAG_RULES
+        self.line = None
+
+    def feed_tag(self, tag):
+        """Run the tag rules, remembering the line of the tag."""
+        self.line = self.document.line_of(tag.offset)
+        super().feed_tag(tag)
+
+    def report(self, rule_id: str, messages):
+        """Record issues, placing tag rule messages on the current tag's line."""
+        if isinstance(messages, str) and self.line is not None:
+            messages = (messages, self.line)
+        super().report(rule_id, messages)
+
+
+def read_source(path: Path) -> HtmlDocument:
+    """Parse a post source with its front matter blanked out line for line."""
+    with phase("read"):
+        text = path.read_text(encoding='utf-8')
+    body = split_body(text)
+    front_matter = text[:len(text) - len(body)]
+    return parse_document('\n' * front_matter.count('\n') + body, path)
+
+
+def check_headings(document: HtmlDocument, title: str) -> List[Dict]:
+    """Heading hierarchy issues of a post, below the layout's h1."""
+    headings = document.headings + [
+        {'level': h['level'], 'text': h['text'], 'offset': h['offset']}
+        for h in markdown_headings(document.source)
+    ]
+    headings.sort(key=lambda heading: heading['offset'])
+    # The layout renders the post title as the page h1
+    layout_h1 = {'level': 1, 'text': title, 'offset': 0}
+    return check_heading_hierarchy.check_hierarchy(
+        [layout_h1] + headings, document.line_of
+    )
+
+
+def check_accessibility(document: HtmlDocument, known_ids: set) -> List[Dict]:
+    """Accessibility issues of a post body.
+
+    `known_ids` are ids the rendered page has outside the source (layout
+    ids and generated heading ids), which references may point at.
+    """
+    for element_id in known_ids:
+        document.ids.setdefault(element_id, [])
+
+    checker = SourceChecker(document)
+    for tag in document.tags:
+        checker.feed_tag(tag)
+    checker.line = None
+    for rule_id, check in PAGE_RULES:
+        if rule_id not in LAYOUT_RULES:
+            checker.report(rule_id, check(checker, document))
+    return checker.issues
+
+
+def check_source(path: Path, reserved_ids: set) -> List[Dict]:
+    """All heading and accessibility issues of one post source."""
+    try:
+        document = read_source(path)
+    except (OSError, UnicodeDecodeError) as e:
+        return [
+            check_heading_hierarchy.issue('parse-error', f"❌ Error reading file: {e}")
+        ]
+
+    with phase("check"):
+        title = read_front_matter(path).get('title', '')
+        toc = build_toc(document.source, reserved_ids)
+        generated_ids = {
+            element_id for element_id in (toc or {}).get('missing_ids', ())
+            if element_id
+        }
+        return (check_headings(document, title)
+                + check_accessibility(document, reserved_ids | generated_ids))
+
+
+def changed_posts(rev: str) -> List[Path]:
+    """Posts that differ from a git revision, plus untracked posts.
+
+    Returns None when git is unavailable or the revision is unknown.
+    """
+    posts = str(POSTS_DIR)
+    changed = run_git('diff', '--name-only', '--diff-filter=d', rev, '--', posts)
+    untracked = run_git('ls-files', '--others', '--exclude-standard', '--', posts)
+    if changed is None or untracked is None:
+        return None
+    names = set(changed.splitlines()) | set(untracked.splitlines())
+    return [Path(name) for name in names if name.endswith('.md')]
+
+
+def find_sources(args) -> List[Path]:
+    """Posts to check: the given files, the changed posts, or every post."""
+    if args.files:
+        return args.files
+    if args.changed is not None:
+        posts = changed_posts(args.changed)
+        if posts is not None:
+            return posts
+        print(f"⚠️  Could not diff against {args.changed}; checking every post",
+              file=sys.stderr)
+    return list(POSTS_DIR.glob('*.md'))
+
+
+def check_sources(posts: List[Path]):
+    """Yield (post, issues) for posts in sorted order."""
+    reserved_ids = layout_ids()
+    for post in sorted(posts):
+        yield post, check_source(post, reserved_ids)
+
+
+def print_results(results) -> int:
+    """Print each issue as `file.md:line: message`; return the issue count."""
+    total_posts = 0
+    posts_with_issues = 0
+    total_issues = 0
+    for post, issues in results:
+        total_posts += 1
+        if issues:
+            posts_with_issues += 1
+            total_issues += len(issues)
+        for found in issues:
+            location = f"{post}:{found['line']}" if found.get('line') else str(post)
+            print(f"{location}: {found['message']} [{found['rule']}]")
+
+    if total_issues:
+        print(f"\n⚠️  Found {total_issues} issues in {posts_with_issues} "
+              f"of {total_posts} posts")
+    else:
+        print(f"✅ {total_posts} posts checked, no issues found")
+    return total_issues
+
+
+def write_findings(results, fmt: str) -> int:
+    """Stream (post, issues) results as NDJSON or SARIF; return the issue count."""
+    total_issues = 0
+    with open_writer(fmt, "check_sources", RULES) as writer:
+        for post, issues in results:
+            total_issues += len(issues)
+            writer.write(post, issues)
+    return total_issues
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Check blog post sources")
+    parser.add_argument(
+        "files",
+        nargs="*",
+        type=Path,
+        help=f"Post sources to check (default: every post in {POSTS_DIR})",
+    )
+    parser.add_argument(
+        "--changed",
+        nargs="?",
+        const="HEAD",
+        metavar="REV",
+        help="Only check posts that differ from REV (default: HEAD) or are untracked",
+    )
+    add_format_argument(parser)
+    add_arguments(parser)
+    return parser.parse_args()
+
+
+def main():
+    """Main entry point."""
+    args = parse_args()
+    with instrumented(args, "check_sources"):
+        with phase("discover"):
+            posts = find_sources(args)
+
+        results = check_sources(posts)
+        with phase("report"):
+            if args.format != "text":
+                total_issues = write_findings(results, args.format)
+            else:
+                total_issues = print_results(results)
+
+    sys.exit(1 if total_issues else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,73 +5,282 @@ Extract structured data from HTML files for manual testing.
 This script extracts JSON-LD structured data from HTML files and outputs
 it in a formatted way for easy copying to Google Rich Results Test tool.
 
+Given a directory or glob pattern, it extracts every JSON-LD block of every
+page in one process (fanned out over a worker pool) and streams one NDJSON
+record per block: {"path", "index", "type", "json"}. Blocks that are not
+valid JSON get an "error" instead of "json". `--group-by-type` prints how
+many blocks and pages carry each @type instead.
+
 Usage:
     uv run python scripts/extract_schema.py <html_file>
+
+    # Every block of the built site as NDJSON
+    uv run python scripts/extract_schema.py _site/ > schema.ndjson
+    uv run python scripts/extract_schema.py "_site/blog/**/*.html" --group-by-type
 """
 
+import argparse
+import glob
 import json
-import re
+import os
 import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Dict, Iterable, List
+
+from html_document import JsonLdBlock, find_json_ld, source_position
+from instrumentation import add_arguments, instrumented, phase
+
+# Chunks of pages handed to each worker, so uneven page sizes still balance
+CHUNKS_PER_JOB = 4
 
 
 def extract_json_ld(html_content: str) -> list:
     """Extract all JSON-LD scripts from HTML content."""
-    pattern = r'<script\s+type="application/ld\+json"[^>]*>(.*?)</script>'
-    matches = re.findall(pattern, html_content, re.DOTALL)
-    
+    return decode_json_ld(find_json_ld(html_content), html_content)
+
+
+def parse_error(source: str, block: JsonLdBlock, error: json.JSONDecodeError) -> str:
+    """Message for a block that is not valid JSON, at its line and column."""
+    line, column = source_position(source, block.offset + error.pos)
+    return f"Error parsing JSON-LD at line {line}, column {column}: {error.msg}"
+
+
+def decode_json_ld(blocks: List[JsonLdBlock], source: str) -> list:
+    """Decode located JSON-LD blocks, reporting invalid ones on stderr."""
     json_ld_objects = []
-    for match in matches:
+    for block in blocks:
         try:
-            json_str = match.strip()
-            obj = json.loads(json_str)
+            obj = json.loads(block.text)
             json_ld_objects.append(obj)
         except json.JSONDecodeError as e:
-            print(f"Error parsing JSON-LD: {e}", file=sys.stderr)
-    
+            print(parse_error(source, block, e), file=sys.stderr)
+
     return json_ld_objects
 
 
-def main():
-    """Main entry point."""
-    if len(sys.argv) < 2:
-        print("Usage: uv run python scripts/extract_schema.py <html_file>")
-        print("\nExample:")
-        print("  uv run python scripts/extract_schema.py _site/index.html")
-        sys.exit(1)
-    
-    file_path = Path(sys.argv[1])
-    
+def block_types(schema) -> List[str]:
+    """@type names of a block: its own, or those of its @graph/array members."""
+    if isinstance(schema, dict) and "@graph" not in schema:
+        schema_type = schema.get("@type")
+        if schema_type is None:
+            return []
+        return [str(name) for name in schema_type] if isinstance(schema_type, list) \
+            else [str(schema_type)]
+    members = schema.get("@graph", []) if isinstance(schema, dict) else schema
+    if not isinstance(members, list):
+        return []
+    types = []
+    for member in members:
+        for name in block_types(member):
+            if name not in types:
+                types.append(name)
+    return types
+
+
+def extract_records(file_path: Path) -> List[Dict]:
+    """One record per JSON-LD block of a page, in page order."""
+    try:
+        source = file_path.read_text(encoding='utf-8')
+    except Exception as e:
+        return [
+            {'path': str(file_path), 'index': 0, 'error': f"Error reading file: {e}"}
+        ]
+
+    records = []
+    for index, block in enumerate(find_json_ld(source), 1):
+        record = {'path': str(file_path), 'index': index}
+        try:
+            schema = json.loads(block.text)
+        except json.JSONDecodeError as e:
+            record['error'] = parse_error(source, block, e)
+        else:
+            types = block_types(schema)
+            record['type'] = types[0] if len(types) == 1 else types
+            record['json'] = schema
+        records.append(record)
+    return records
+
+
+def extract_all(html_files: List[Path], jobs: int) -> Iterable[Dict]:
+    """Yield the records of every page in sorted file order.
+
+    With more than one job, pages are extracted by a process pool in
+    order-preserving chunks.
+    """
+    html_files = sorted(html_files)
+    if jobs <= 1 or len(html_files) <= 1:
+        for html_file in html_files:
+            yield from extract_records(html_file)
+        return
+
+    chunksize = max(1, -(-len(html_files) // (jobs * CHUNKS_PER_JOB)))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        chunks = executor.map(extract_records, html_files, chunksize=chunksize)
+        for records in chunks:
+            yield from records
+
+
+def find_html_files(patterns: List[str]) -> List[Path]:
+    """HTML files named by files, directories (searched recursively) or globs."""
+    html_files = set()
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            html_files.update(path.rglob("*.html"))
+        elif path.is_file():
+            html_files.add(path)
+        else:
+            html_files.update(
+                Path(match) for match in glob.glob(pattern, recursive=True)
+                if Path(match).is_file()
+            )
+    return sorted(html_files)
+
+
+def write_records(records: Iterable[Dict]) -> int:
+    """Stream records as NDJSON; return the number of valid blocks."""
+    blocks = 0
+    for record in records:
+        if 'json' in record:
+            blocks += 1
+        sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return blocks
+
+
+def print_type_summary(records: Iterable[Dict]) -> int:
+    """Print block and page counts per @type; return the number of valid blocks."""
+    block_counts = defaultdict(int)
+    pages = defaultdict(set)
+    blocks = 0
+    errors = 0
+    for record in records:
+        if 'json' not in record:
+            errors += 1
+            where = f"{record['path']} (block {record['index']})"
+            print(f"⚠️  {where}: {record['error']}", file=sys.stderr)
+            continue
+        blocks += 1
+        types = record['type']
+        if not isinstance(types, list):
+            types = [types]
+        for name in types or ["(no @type)"]:
+            block_counts[name] += 1
+            pages[name].add(record['path'])
+
+    print(f"📋 {blocks} structured data block(s) across "
+          f"{len(set().union(*pages.values()))} page(s)")
+    print("="*80)
+    by_count = sorted(block_counts.items(), key=lambda item: (-item[1], item[0]))
+    for name, count in by_count:
+        print(f"  {name}: {count} block(s) on {len(pages[name])} page(s)")
+    if errors:
+        print(f"\n⚠️  {errors} block(s) could not be read or parsed")
+    return blocks
+
+
+def extract_file(file_path: Path):
+    """Print every structured data block in an HTML file."""
     if not file_path.exists():
         print(f"Error: File {file_path} does not exist", file=sys.stderr)
         sys.exit(1)
-    
+
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        with phase("read"):
+            source = file_path.read_text(encoding='utf-8')
     except Exception as e:
         print(f"Error reading file: {e}", file=sys.stderr)
         sys.exit(1)
-    
-    schemas = extract_json_ld(content)
-    
+
+    with phase("check"):
+        schemas = decode_json_ld(find_json_ld(source), source)
+
     if not schemas:
         print(f"No structured data found in {file_path}", file=sys.stderr)
         sys.exit(1)
-    
-    print(f"Found {len(schemas)} structured data block(s) in {file_path.name}")
-    print("="*80)
-    
-    for i, schema in enumerate(schemas, 1):
-        print(f"\n📋 Schema Block {i}:")
-        print("-"*80)
-        print(json.dumps(schema, indent=2, ensure_ascii=False))
-        print("-"*80)
-    
-    print("\n✅ Copy the above JSON to test at:")
-    print("   https://search.google.com/test/rich-results")
-    print("   https://validator.schema.org/")
-    print()
+
+    with phase("report"):
+        print(f"Found {len(schemas)} structured data block(s) in {file_path.name}")
+        print("="*80)
+
+        for i, schema in enumerate(schemas, 1):
+            print(f"\n📋 Schema Block {i}:")
+            print("-"*80)
+            print(json.dumps(schema, indent=2, ensure_ascii=False))
+            print("-"*80)
+
+        print("\n✅ Copy the above JSON to test at:")
+        print("   https://search.google.com/test/rich-results")
+        print("   https://validator.schema.org/")
+        print()
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Extract JSON-LD structured data from HTML files"
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        help="HTML file, or directories / glob patterns to extract from as NDJSON",
+    )
+    parser.add_argument(
+        "--group-by-type",
+        action="store_true",
+        help="Print block and page counts per @type instead of the records",
+    )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes for directory mode (default: CPU count)",
+    )
+    add_arguments(parser)
+    return parser.parse_args()
+
+
+def main():
+    """Main entry point."""
+    args = parse_args()
+    if not args.paths:
+        print("Usage: uv run python scripts/extract_schema.py <html_file>")
+        print("       uv run python scripts/extract_schema.py <dir|glob> "
+              "[--group-by-type]")
+        print("\nExamples:")
+        print("  uv run python scripts/extract_schema.py _site/index.html")
+        print("  uv run python scripts/extract_schema.py _site/ > schema.ndjson")
+        sys.exit(1)
+
+    with instrumented(args, "extract_schema"):
+        single = Path(args.paths[0])
+        if len(args.paths) == 1 and single.is_file() and not args.group_by_type:
+            extract_file(single)
+            return
+
+        with phase("discover"):
+            # An argument matching nothing is a typo, not an empty site
+            for pattern in args.paths:
+                if not (Path(pattern).exists() or glob.glob(pattern, recursive=True)):
+                    print(f"Error: File {pattern} does not exist", file=sys.stderr)
+                    sys.exit(1)
+            html_files = find_html_files(args.paths)
+        records = extract_all(html_files, args.jobs)
+        with phase("report"):
+            if args.group_by_type:
+                blocks = print_type_summary(records)
+            else:
+                try:
+                    blocks = write_records(records)
+                except BrokenPipeError:
+                    # Output closed early (e.g. piped into head)
+                    os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+                    return
+
+    if not blocks:
+        print(f"No structured data found in {len(html_files)} file(s)", file=sys.stderr)
+        sys.exit(1)
 
 
 if __name__ == "__main__":
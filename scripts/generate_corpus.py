@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic site corpus for benchmarking the scripts/ tooling.
+
+The corpus clones the structure of the real site: the root page templates,
+blog/posts-md posts with their front matter, the data/*.json files (with
+blog-index.json grown to one entry per post) and the rendered _site pages.
+Posts are cycled from the real ones and given unique slugs and permalinks.
+
+Rendered pages are cloned from the real _site when it has been built.
+Otherwise a minimal stand-in for the Eleventy build inlines the layouts
+and partials, which is close enough for the audit scripts.
+
+Usage:
+    uv run python scripts/generate_corpus.py --pages 1000 --output .cache/corpus/1000
+
+    # Also commit the corpus to a fresh git repository (for generate_sitemap.py)
+    uv run python scripts/generate_corpus.py --pages 10000 --output /tmp/corpus --git
+"""
+
+import argparse
+import json
+import re
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Tuple
+
+from generate_sitemap import POSTS_DIR, SITE_DIR, read_front_matter, site_output_path
+
+INCLUDES_DIR = Path("_includes")
+DATA_DIR = Path("data")
+DATA_FILES = ["publications.json", "news.json", "blog.json", "home_content.json"]
+
+INCLUDE_PATTERN = re.compile(r'{%\s*include\s+"([^"]+)"\s*%}')
+IF_PATTERN = re.compile(
+    r'{%\s*if\s+([^%]+?)\s*%}((?:(?!{%\s*if\s).)*?){%\s*endif\s*%}', re.DOTALL
+)
+BRANCH_PATTERN = re.compile(r'{%\s*(elif\s+[^%]+?|else)\s*%}')
+OUTPUT_PATTERN = re.compile(r'{{\s*(.+?)\s*}}')
+IMAGE_PATTERN = re.compile(
+    r'{%\s*responsiveImage\s+"([^"]+)"(?:\s*,\s*"([^"]*)")?\s*%}'
+)
+TAG_PATTERN = re.compile(r'{%.*?%}', re.DOTALL)
+COMMENT_PATTERN = re.compile(r'{#.*?#}', re.DOTALL)
+PERMALINK_LINE = re.compile(r'^permalink:.*$', re.MULTILINE)
+TITLE_LINE = re.compile(r'^title:\s*"?(.*?)"?\s*$', re.MULTILINE)
+
+
+def split_front_matter(text: str) -> Tuple[str, str]:
+    """Split a template into its front matter block and body."""
+    if not text.startswith('---'):
+        return '', text
+    end = text.find('\n---', 3)
+    return text[:end + 4], text[end + 4:]
+
+
+def lookup(context: Dict, name: str):
+    """Resolve a dotted variable name against the render context."""
+    value = context
+    for part in name.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def evaluate(expression: str, context: Dict):
+    """Evaluate the small Nunjucks expression subset used by the layouts."""
+    for option in expression.split(' or '):
+        option = option.split('|')[0].strip()
+        if option[:1] in '"\'':
+            return option.strip('"\'')
+        if '==' in option:
+            name, literal = option.split('==')
+            value = lookup(context, name.strip()) == literal.strip().strip('"\'')
+        elif '.startsWith(' in option:
+            name, literal = option.split('.startsWith(')
+            value = str(lookup(context, name) or '').startswith(
+                literal.rstrip(')').strip('"\'')
+            )
+        else:
+            value = lookup(context, option)
+        if value:
+            return value
+    return ''
+
+
+def render(template: str, context: Dict) -> str:
+    """Render a layout with includes, conditionals and output tags resolved."""
+    template = INCLUDE_PATTERN.sub(
+        lambda m: (INCLUDES_DIR / m.group(1)).read_text(encoding='utf-8'), template
+    )
+    # Template comments (post bodies are left alone: {# can be content there)
+    template = COMMENT_PATTERN.sub('', template)
+
+    def resolve_if(match):
+        parts = BRANCH_PATTERN.split(match.group(2))
+        branches = [(match.group(1), parts[0])]
+        for keyword, body in zip(parts[1::2], parts[2::2]):
+            condition = keyword[5:] if keyword.startswith('elif') else "'else'"
+            branches.append((condition, body))
+        for condition, body in branches:
+            if evaluate(condition, context):
+                return body
+        return ''
+
+    # Innermost conditionals first, so nested blocks resolve correctly
+    while True:
+        template, count = IF_PATTERN.subn(resolve_if, template)
+        if not count:
+            break
+
+    template = OUTPUT_PATTERN.sub(
+        lambda m: str(context['content'] if m.group(1).startswith('content')
+                      else evaluate(m.group(1), context)),
+        template,
+    )
+    return TAG_PATTERN.sub('', template)
+
+
+def render_page(source: Path, layouts: Dict[str, str]) -> str:
+    """Minimal stand-in for the Eleventy build of a single template."""
+    text = source.read_text(encoding='utf-8')
+    context = dict(read_front_matter(source))
+    body = split_front_matter(text)[1]
+    body = IMAGE_PATTERN.sub(
+        lambda m: f'<picture><img src="{m.group(1)}" alt="{m.group(2) or ""}" '
+                  f'loading="lazy" decoding="async"></picture>',
+        body,
+    )
+    body = TAG_PATTERN.sub('', body)
+    context['page'] = {'url': context.get('permalink') or '/'}
+
+    layout = context.get('layout', '')
+    while layout:
+        context['content'] = body
+        front_matter, template = layouts[layout]
+        body = render(template, context)
+        layout = re.search(r'^layout:\s*(\S+)', front_matter, re.MULTILINE)
+        layout = layout.group(1) if layout else ''
+    return body
+
+
+def load_layouts() -> Dict[str, Tuple[str, str]]:
+    """Load every layout as (front matter, template)."""
+    return {
+        f"layouts/{path.name}": split_front_matter(path.read_text(encoding='utf-8'))
+        for path in (INCLUDES_DIR / 'layouts').glob('*.njk')
+    }
+
+
+def rendered_html(source: Path, url: str, layouts) -> str:
+    """Rendered HTML for a template, from _site when it has been built."""
+    built = site_output_path(url)
+    if SITE_DIR.exists() and built.exists():
+        return built.read_text(encoding='utf-8')
+    return render_page(source, layouts)
+
+
+def clone_post(text: str, permalink: str, index: int) -> str:
+    """Give a post a unique permalink and title."""
+    text = PERMALINK_LINE.sub(f'permalink: "{permalink}"', text, count=1)
+    return TITLE_LINE.sub(
+        lambda m: f'title: "{m.group(1)} ({index})"', text, count=1
+    )
+
+
+def write_page(output: Path, url: str, html: str):
+    """Write a rendered page to the corpus _site."""
+    path = site_output_path(url, output / SITE_DIR)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(html, encoding='utf-8')
+
+
+def generate_corpus(pages: int, output: Path):
+    """Write a corpus with the real root pages and `pages` cloned posts."""
+    layouts = load_layouts()
+    (output / POSTS_DIR).mkdir(parents=True, exist_ok=True)
+    (output / DATA_DIR).mkdir(parents=True, exist_ok=True)
+
+    # Root page templates, rendered once each
+    for source in sorted(Path('.').glob('*.html')):
+        shutil.copy(source, output / source.name)
+        url = read_front_matter(source).get('permalink') or '/'
+        write_page(output, url, rendered_html(source, url, layouts))
+
+    # Posts, cycled from the real ones
+    templates = []
+    for source in sorted(POSTS_DIR.glob('*.md')):
+        url = read_front_matter(source)['permalink']
+        templates.append((
+            source, url,
+            source.read_text(encoding='utf-8'),
+            rendered_html(source, url, layouts),
+        ))
+
+    with open(DATA_DIR / 'blog-index.json', 'r', encoding='utf-8') as f:
+        blog_index = json.load(f)
+    real_posts = blog_index['posts']
+    index_posts = []
+
+    for i in range(pages):
+        source, url, text, html = templates[i % len(templates)]
+        slug = f"{source.stem}-{i:06d}"
+        permalink = f"/blog/posts/{slug}.html"
+        (output / POSTS_DIR / f"{slug}.md").write_text(
+            clone_post(text, permalink, i), encoding='utf-8'
+        )
+        write_page(output, permalink, html.replace(url, permalink))
+
+        post = dict(real_posts[i % len(real_posts)])
+        post['id'] = slug
+        post['content'] = permalink
+        index_posts.append(post)
+
+    blog_index['posts'] = index_posts
+    with open(output / DATA_DIR / 'blog-index.json', 'w', encoding='utf-8') as f:
+        json.dump(blog_index, f, indent=2, ensure_ascii=False)
+    for name in DATA_FILES:
+        shutil.copy(DATA_DIR / name, output / DATA_DIR / name)
+
+
+def commit_corpus(output: Path):
+    """Commit the corpus to a fresh git repository."""
+    def git(*args):
+        subprocess.run(['git', *args], cwd=output, check=True, capture_output=True)
+
+    git('init', '-q')
+    git('add', '.')
+    git('-c', 'user.name=corpus', '-c', 'user.email=corpus@localhost',
+        'commit', '-q', '-m', 'Synthetic corpus')
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Generate a synthetic site corpus")
+    parser.add_argument(
+        "--pages", type=int, required=True, help="Number of blog posts to generate"
+    )
+    parser.add_argument(
+        "--output", type=Path, required=True, help="Directory to write the corpus to"
+    )
+    parser.add_argument(
+        "--git", action="store_true", help="Commit the corpus to a new git repository"
+    )
+    return parser.parse_args()
+
+
+def main():
+    """Main entry point."""
+    args = parse_args()
+    if args.output.exists() and any(args.output.iterdir()):
+        print(f"Error: {args.output} already exists and is not empty", file=sys.stderr)
+        sys.exit(1)
+
+    generate_corpus(args.pages, args.output)
+    if args.git:
+        commit_corpus(args.output)
+    print(f"✅ Corpus generated: {args.output} ({args.pages} posts)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+Generate the JSON-LD structured data of the blog posts and data-driven pages.
+
+Every post in blog/posts-md gets a BlogPosting (with its author and
+publisher as Person objects) and a BreadcrumbList, built from its front
+matter and its entry in data/blog-index.json. /publications/ gets a
+CollectionPage listing each paper of data/publications.json as a
+ScholarlyArticle with its authors, and /podcast/ its PodcastSeries. The
+home page and /about/ carry the owner's Person, with the profile image
+and social links of data/home_content.json.
+
+Each block is checked with the validate_schema.py rules as it is
+generated, so schema mistakes fail here instead of after the build. The
+result is written to _data/jsonld.json, keyed by page URL, for base.njk
+to inline at build time.
+
+Blocks are cached in .cache/ by the hash of their inputs, so only new or
+edited posts (or pages whose data file changed) are generated again.
+
+Usage:
+    uv run python scripts/generate_jsonld.py
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from generate_sitemap import CACHE_DIR, POSTS_DIR, default_permalink, read_front_matter
+from instrumentation import add_arguments, instrumented, phase
+from validate_schema import validate_block
+
+DATA_DIR = Path("data")
+BLOG_INDEX_FILE = DATA_DIR / "blog-index.json"
+PUBLICATIONS_FILE = DATA_DIR / "publications.json"
+HOME_CONTENT_FILE = DATA_DIR / "home_content.json"
+OUTPUT_FILE = Path("_data/jsonld.json")
+JSONLD_CACHE_FILE = CACHE_DIR / "jsonld.json"
+# Bump when the generated blocks change so cached entries are not reused
+JSONLD_VERSION = "2"
+
+SITE_URL = "https://www.itzikbs.com"
+OWNER = "Itzik Ben-Shabat"
+# Spellings of the owner's name in the publication author lists
+OWNER_NAMES = {OWNER, "Yizhak Ben-Shabat", "Y. Ben-Shabat", "Y. Ben Shabat"}
+DEFAULT_IMAGE = f"{SITE_URL}/assets/images/profile/Itzik_Ben_Shabat_portrait.jpg"
+OWNER_ID = f"{SITE_URL}/#person"
+# Owner details no data file holds; the image and sameAs links come from
+# home_content.json
+PROFILE = {
+    "alternateName": "Yizhak Ben-Shabat",
+    "description": "Research Scientist at Roblox specializing in 3D computer vision, "
+                   "point cloud processing, and deep learning for 3D understanding. "
+                   "PhD from Technion.",
+    "jobTitle": "Research Scientist",
+    "worksFor": {
+        "@type": "Organization",
+        "name": "Roblox",
+        "url": "https://www.roblox.com",
+    },
+    "alumniOf": [{
+        "@type": "CollegeOrUniversity",
+        "name": "Technion - Israel Institute of Technology",
+        "url": "https://www.technion.ac.il",
+    }],
+    "knowsAbout": [
+        "Computer Vision", "3D Computer Vision", "Machine Learning", "Deep Learning",
+        "Point Cloud Processing", "3D Reconstruction", "Neural Networks",
+        "Implicit Neural Representations",
+    ],
+}
+PROFILE_IMAGE_SIZE = ("500", "500")
+WEBSITE = {
+    "alternateName": "Yizhak Ben-Shabat - Research Portfolio",
+    "description": "Personal website and research portfolio featuring publications, "
+                   "blog posts, and podcast episodes on 3D computer vision and "
+                   "machine learning",
+}
+PODCAST = {
+    "name": "Talking Papers Podcast",
+    "description": "Deep dives into cutting-edge research papers with their authors",
+    "genre": [
+        "Technology", "Science", "Education", "Computer Vision", "Machine Learning",
+    ],
+}
+
+
+def absolute_url(path: str) -> str:
+    """Site URL of a root-relative path; absolute URLs are kept."""
+    return path if path.startswith(("http://", "https://")) else SITE_URL + path
+
+
+def public_url(url: str) -> Optional[str]:
+    """Absolute URL of a link from a data file, or None when it is not a web URL.
+
+    Root-relative paths are made absolute; anything else must be http(s)
+    with a dotted host, which rules out e.g. browser-extension URLs.
+    """
+    if url.startswith("/") and not url.startswith("//"):
+        return absolute_url(url)
+    try:
+        parts = urlsplit(url)
+        host = parts.hostname or ""
+    except ValueError:
+        return None
+    if parts.scheme not in ("http", "https") or "." not in host.strip("."):
+        return None
+    return url
+
+
+def person(name: str) -> Dict:
+    """Person object, linked to the site for the owner."""
+    node = {"@type": "Person", "name": name}
+    if name in OWNER_NAMES:
+        node["url"] = SITE_URL
+    return node
+
+
+def breadcrumbs(*crumbs) -> Dict:
+    """BreadcrumbList from (name, path) pairs; the current page has no path."""
+    items = []
+    for position, (name, path) in enumerate(crumbs, 1):
+        item = {"@type": "ListItem", "position": position, "name": name}
+        if path:
+            item["item"] = absolute_url(path)
+        items.append(item)
+    return {"@type": "BreadcrumbList", "itemListElement": items}
+
+
+def graph(*nodes: Dict) -> Dict:
+    """A JSON-LD block holding several top-level objects."""
+    return {"@context": "https://schema.org", "@graph": list(nodes)}
+
+
+def blog_posting(front_matter: Dict[str, str], url: str, entry: Dict) -> Dict:
+    """BlogPosting and breadcrumbs of a post."""
+    title = front_matter.get("title") or entry.get("title")
+    date = front_matter.get("date") or entry.get("date")
+    posting = {
+        "@type": "BlogPosting",
+        "headline": title,
+        "datePublished": f"{date}T00:00:00Z" if date else None,
+        "dateModified": f"{entry.get('updated') or date}T00:00:00Z" if date else None,
+        "author": person(front_matter.get("author") or entry.get("author") or OWNER),
+        "publisher": person(OWNER),
+        "description": front_matter.get("description") or entry.get("excerpt") or title,
+        "mainEntityOfPage": {"@type": "WebPage", "@id": absolute_url(url)},
+        "image": public_url(entry.get("image") or "") or DEFAULT_IMAGE,
+    }
+    if entry.get("categories"):
+        posting["articleSection"] = entry["categories"]
+    if entry.get("tags"):
+        posting["keywords"] = ", ".join(entry["tags"])
+    # Missing inputs are left out, so validation reports the missing field
+    posting = {key: value for key, value in posting.items() if value}
+    return graph(posting, breadcrumbs(("Home", "/"), ("Blog", "/blog/"), (title, None)))
+
+
+def author_names(authors: str) -> List[str]:
+    """Names in a publication's author list.
+
+    Some lists trail off into venue details ("..., Vol. 174"); the list
+    ends at the first part that does not look like a name.
+    """
+    names = []
+    for part in authors.split(","):
+        name = part.strip().replace("*", "")
+        if name.startswith("and "):
+            name = name[4:]
+        name = name.rstrip(".").strip()
+        if not name or " and " in name or any(c.isdigit() or c in "()" for c in name):
+            break
+        names.append(name)
+    return names
+
+
+def scholarly_article(publication: Dict) -> Dict:
+    """ScholarlyArticle for an entry of publications.json."""
+    article = {
+        "@type": "ScholarlyArticle",
+        "headline": publication.get("title"),
+        "author": [
+            person(name) for name in author_names(publication.get("authors", ""))
+        ],
+        "datePublished": str(publication.get("year", "")),
+    }
+    links = {}
+    for link in publication.get("links", []):
+        url = public_url(link.get("url") or "")
+        if url:
+            links.setdefault(link.get("name"), url)
+    url = (
+        links.get("paper") or links.get("preprint")
+        or next(iter(links.values()), None)
+    )
+    if url:
+        article["url"] = url
+    if publication.get("image"):
+        article["image"] = public_url(publication["image"])
+    return {key: value for key, value in article.items() if value}
+
+
+def publications_page(front_matter: Dict[str, str], url: str) -> Dict:
+    """CollectionPage of every publication, and breadcrumbs."""
+    with open(PUBLICATIONS_FILE, "r", encoding="utf-8") as f:
+        publications = json.load(f)
+    page = {
+        "@type": "CollectionPage",
+        "name": "Publications",
+        "description": front_matter.get("description"),
+        "url": absolute_url(url),
+        "author": person(OWNER),
+        "hasPart": [scholarly_article(publication) for publication in publications],
+    }
+    return graph(page, breadcrumbs(("Home", "/"), ("Publications", None)))
+
+
+def podcast_page(front_matter: Dict[str, str], url: str) -> Dict:
+    """PodcastSeries of the podcast page, and breadcrumbs."""
+    series = {
+        "@type": "PodcastSeries",
+        "name": PODCAST["name"],
+        "description": PODCAST["description"],
+        "url": absolute_url(url),
+        "author": person(OWNER),
+        "genre": PODCAST["genre"],
+    }
+    return graph(series, breadcrumbs(("Home", "/"), ("Podcast", None)))
+
+
+def owner_profile() -> Dict:
+    """Standalone Person of the owner, with image and sameAs from home_content.json."""
+    with open(HOME_CONTENT_FILE, "r", encoding="utf-8") as f:
+        home = json.load(f)
+    profile = {
+        "@type": "Person", "@id": OWNER_ID, "name": OWNER, **PROFILE, "url": SITE_URL,
+    }
+    if home.get("profile_image"):
+        width, height = PROFILE_IMAGE_SIZE
+        profile["image"] = {
+            "@type": "ImageObject",
+            "url": absolute_url("/" + home["profile_image"].lstrip("/")),
+            "width": width,
+            "height": height,
+        }
+    social = home.get("contact", {}).get("social", [])
+    profile["sameAs"] = [
+        url for url in (public_url(link.get("url") or "") for link in social) if url
+    ]
+    return {key: value for key, value in profile.items() if value}
+
+
+def home_page(front_matter: Dict[str, str], url: str) -> Dict:
+    """The owner's Person and the WebSite, for the home page."""
+    website = {
+        "@type": "WebSite",
+        "name": OWNER,
+        **WEBSITE,
+        "url": SITE_URL,
+        "author": {"@id": OWNER_ID},
+    }
+    return graph(owner_profile(), website)
+
+
+def about_page(front_matter: Dict[str, str], url: str) -> Dict:
+    """ProfilePage about the owner, the owner's Person, and breadcrumbs."""
+    page = {
+        "@type": "ProfilePage",
+        "name": f"About {OWNER}",
+        "description": front_matter.get("description"),
+        "url": absolute_url(url),
+        "mainEntity": {"@id": OWNER_ID},
+    }
+    return graph(page, owner_profile(), breadcrumbs(("Home", "/"), ("About", None)))
+
+
+# Pages whose structured data is built from data files:
+# source file -> (builder, data files it reads)
+PAGES: Dict[Path, tuple] = {
+    Path("index.html"): (home_page, [HOME_CONTENT_FILE]),
+    Path("about.html"): (about_page, [HOME_CONTENT_FILE]),
+    Path("publications.html"): (publications_page, [PUBLICATIONS_FILE]),
+    Path("podcast.html"): (podcast_page, []),
+}
+
+
+def serialize(block: Dict) -> str:
+    """Compact JSON for a <script> body; '<' is escaped so it cannot end the script."""
+    text = json.dumps(block, ensure_ascii=False, separators=(",", ":"))
+    return text.replace("<", "\\u003c")
+
+
+def input_digest(*parts: bytes) -> str:
+    """Hash of everything a block is generated from."""
+    digest = hashlib.sha256(JSONLD_VERSION.encode())
+    for part in parts:
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def check_block(url: str, block: Dict) -> List[str]:
+    """Validation errors of a generated block; warnings are printed."""
+    errors = []
+
+    def report(level: str, message: str):
+        if level == "error":
+            errors.append(f"{url}{message}")
+        elif level == "warning":
+            print(f"⚠️  {url}{message}")
+
+    validate_block(block, report)
+    return errors
+
+
+def load_cache(path: Path) -> Dict:
+    """Input hash -> serialized block from the last run."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get("version") != JSONLD_VERSION:
+        return {}
+    return cache.get("entries", {})
+
+
+def load_blog_index() -> Dict[str, Dict]:
+    """blog-index.json entries by post URL."""
+    with open(BLOG_INDEX_FILE, "r", encoding="utf-8") as f:
+        posts = json.load(f).get("posts", [])
+    return {post["content"]: post for post in posts if post.get("content")}
+
+
+def generate_jsonld(
+    output: Path = OUTPUT_FILE, cache_file: Path = JSONLD_CACHE_FILE
+) -> bool:
+    """Write the JSON-LD of every page, generating only changed ones.
+
+    Returns False, leaving the output untouched, when a block has errors.
+    """
+    entries = {}
+    blocks = {}
+    errors = []
+    generated = 0
+
+    with phase("discover"):
+        posts = sorted(POSTS_DIR.glob("*.md"))
+    with phase("read"):
+        index = load_blog_index()
+    cache = load_cache(cache_file)
+
+    # (url, input hash, builder, builder arguments) of every page
+    pages: List[tuple] = []
+    for post in posts:
+        with phase("read"):
+            front_matter = read_front_matter(post)
+            url = front_matter.get("permalink") or default_permalink(post)
+            entry = index.get(url, {})
+            digest = input_digest(
+                post.read_bytes(), json.dumps(entry, sort_keys=True).encode("utf-8")
+            )
+        pages.append((url, digest, blog_posting, (front_matter, url, entry)))
+    for source, (builder, data_files) in PAGES.items():
+        with phase("read"):
+            front_matter = read_front_matter(source)
+            url = front_matter.get("permalink") or default_permalink(source)
+            digest = input_digest(
+                source.read_bytes(), *(f.read_bytes() for f in data_files)
+            )
+        pages.append((url, digest, builder, (front_matter, url)))
+
+    for url, digest, build, build_args in pages:
+        text = cache.get(digest)
+        if text is None:
+            with phase("check"):
+                block = build(*build_args)
+                block_errors = check_block(url, block)
+            generated += 1
+            if block_errors:
+                errors.extend(block_errors)
+                continue
+            text = serialize(block)
+        entries[digest] = text
+        blocks[url] = text
+
+    if errors:
+        print(
+            f"\n❌ {len(errors)} structured data error(s); "
+            f"{output} was not updated:"
+        )
+        for error in errors:
+            print(f"  ✗ {error}")
+        return False
+
+    with phase("report"):
+        text = json.dumps(blocks, indent=1, ensure_ascii=False) + "\n"
+        # Leave the file untouched when nothing changed, so watchers stay idle
+        if not output.exists() or output.read_text(encoding="utf-8") != text:
+            output.parent.mkdir(parents=True, exist_ok=True)
+            output.write_text(text, encoding="utf-8")
+
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(cache_file, "w", encoding="utf-8") as f:
+            json.dump({"version": JSONLD_VERSION, "entries": entries}, f)
+
+    print(f"✅ Structured data generated: {output}")
+    print(f"🧩 {len(blocks)} pages ({len(posts)} posts)")
+    print(f"🔄 {generated} generated, {len(pages) - generated} unchanged")
+    return True
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Generate JSON-LD structured data")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=OUTPUT_FILE,
+        help=f"JSON file to write (default: {OUTPUT_FILE})",
+    )
+    add_arguments(parser)
+    return parser.parse_args()
+
+
+def main():
+    """Main entry point."""
+    args = parse_args()
+    with instrumented(args, "generate_jsonld"):
+        ok = generate_jsonld(args.output)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,60 @@
 Generate sitemap.xml for the website
 """
 
+import argparse
+import gzip
+import hashlib
+import json
 import os
+import re
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
 import subprocess
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+from instrumentation import add_arguments, instrumented, phase
 
 BASE_URL = "https://itzikbs.com"
 OUTPUT_FILE = "sitemap.xml"
+INDEX_FILE = "sitemap_index.xml"
+
+# Sitemap protocol limits per file (uncompressed)
+MAX_SHARD_URLS = 50000
+MAX_SHARD_BYTES = 50 * 1024 * 1024
+
+URLSET_OPEN = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"\n'
+    '        xmlns:image="http://www.google.com/schemas/sitemap-image/1.1">\n'
+)
+URLSET_CLOSE = "</urlset>"
+
+# Persisted path -> last commit date index, keyed by the HEAD it was built at
+CACHE_DIR = Path(".cache")
+GIT_INDEX_FILE = CACHE_DIR / "sitemap-git-index.json"
+SHARD_MANIFEST_FILE = CACHE_DIR / "sitemap-shards.json"
+IMAGE_CACHE_FILE = CACHE_DIR / "sitemap-images.json"
+CONTENT_MANIFEST_FILE = CACHE_DIR / "sitemap-content.json"
+COMMIT_MARKER = "\x1e"
+
+# Page sources
+POSTS_DIR = Path("blog/posts-md")
+SITE_DIR = Path("_site")
+FRONT_MATTER_CHUNK = 2048
+# Header of a YAML block scalar: `>` (folded) or `|` (literal), with options
+BLOCK_SCALAR_PATTERN = re.compile(r'[>|][-+]?\d?')
+
+# Hash rendered pages in a process pool once there are enough of them
+PARALLEL_HASH_THRESHOLD = 256
+WHITESPACE_PATTERN = re.compile(rb'\s+')
+
+# {% responsiveImage "src", "alt" %} shortcodes in posts-md
+RESPONSIVE_IMAGE_PATTERN = re.compile(
+    r'{%-?\s*responsiveImage\s+["\']([^"\']+)["\']'
+)
 
 # Page priorities
 PRIORITIES = {
@@ -22,82 +69,637 @@ PRIORITIES = {
     "contact.html": "0.7",
 }
 
-def get_html_files():
-    """Get all HTML files in the project"""
-    html_files = []
-    
-    # Root HTML files
-    for file in Path(".").glob("*.html"):
-        if not file.name.startswith('.'):
-            html_files.append(str(file))
-    
-    # Blog posts
-    blog_posts_dir = Path("blog/posts")
-    if blog_posts_dir.exists():
-        for file in blog_posts_dir.glob("*.html"):
-            html_files.append(str(file))
-    
-    return html_files
+def read_front_matter(file_path, chunk_size=FRONT_MATTER_CHUNK) -> Dict[str, str]:
+    """Read the top-level `key: value` pairs of a file's front matter.
 
-def get_last_modified(file_path):
-    """Get last modified date of file from git or filesystem"""
+    Values may also be `>` / `|` block scalars (e.g. a customSchema block).
+
+    Only the leading bytes are read, in chunks, until the closing `---`
+    fence is found, so the page body is never loaded.
+    """
+    header = ''
+    with open(file_path, 'r', encoding='utf-8') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            header += chunk
+            if not header.startswith('---'):
+                return {}
+            end = header.find('\n---', 3)
+            if end != -1:
+                header = header[3:end]
+                break
+            if not chunk:
+                return {}
+
+    front_matter = {}
+    block_key = None  # key of the `key: >` / `key: |` block scalar being read
+    for line in header.splitlines():
+        if block_key is not None:
+            if not line.strip() or line[0] in ' \t':
+                block_lines.append(line)
+                continue
+            front_matter[block_key] = block_scalar(block_style, block_lines)
+            block_key = None
+        if not line or line[0] in ' \t#-':
+            continue
+        key, sep, value = line.partition(':')
+        if sep:
+            value = value.strip()
+            if BLOCK_SCALAR_PATTERN.fullmatch(value):
+                block_key, block_style, block_lines = key.strip(), value[0], []
+                continue
+            front_matter[key.strip()] = value.strip('"\'')
+    if block_key is not None:
+        front_matter[block_key] = block_scalar(block_style, block_lines)
+    return front_matter
+
+
+def block_scalar(style: str, lines: List[str]) -> str:
+    """Value of a YAML literal (|) or folded (>) block scalar from its lines."""
+    indent = min(
+        (len(line) - len(line.lstrip()) for line in lines if line.strip()), default=0
+    )
+    lines = [line[indent:] for line in lines]
+    while lines and not lines[-1].strip():
+        lines.pop()
+    if style == '|':
+        return '\n'.join(lines) + '\n'
+
+    # Folded: lines join with spaces; blank and more-indented lines keep breaks
+    text = lines[0] if lines else ''
+    for previous, line in zip(lines, lines[1:]):
+        if not line.strip():
+            text += '\n'
+        elif not previous.strip():
+            text += line
+        elif line[0] in ' \t' or previous[0] in ' \t':
+            text += '\n' + line
+        else:
+            text += ' ' + line
+    return text + '\n'
+
+
+def default_permalink(file_path: Path) -> str:
+    """Eleventy's default output URL for a template without a permalink"""
+    parent = file_path.parent.as_posix()
+    prefix = '/' if parent == '.' else f'/{parent}/'
+    if file_path.stem == 'index':
+        return prefix
+    return f'{prefix}{file_path.stem}/'
+
+
+def get_page_priority(source: str) -> str:
+    """Sitemap priority for a page, keyed by its source file"""
+    if source.startswith(f"{POSTS_DIR.as_posix()}/"):
+        return "0.6"
+    return PRIORITIES.get(source, "0.5")
+
+
+def get_source_pages() -> List[Dict[str, str]]:
+    """Get all pages from root templates and blog/posts-md front matter"""
+    sources = [
+        file for file in Path(".").glob("*.html")
+        if not file.name.startswith('.')
+    ]
+    sources.extend(POSTS_DIR.glob("*.md"))
+
+    pages = []
+    for file in sources:
+        permalink = read_front_matter(file).get('permalink')
+        if permalink == 'false':
+            continue
+        source = file.as_posix()
+        pages.append({
+            'url': permalink or default_permalink(file),
+            'source': source,
+            'priority': get_page_priority(source),
+        })
+    return pages
+
+
+def site_file_url(file_path: Path, site_dir: Path) -> str:
+    """URL path that serves a file from the built site"""
+    relative = file_path.relative_to(site_dir)
+    if relative.name == 'index.html':
+        parent = relative.parent.as_posix()
+        return '/' if parent == '.' else f'/{parent}/'
+    return f'/{relative.as_posix()}'
+
+
+def get_site_pages(site_dir: Path = SITE_DIR) -> List[Dict[str, str]]:
+    """Get all pages by walking the built _site output.
+
+    Source templates are still used for lastmod and priority when a
+    page's permalink maps back to one.
+    """
+    by_url = {page['url']: page for page in get_source_pages()}
+
+    pages = []
+    for file in site_dir.rglob("*.html"):
+        url = site_file_url(file, site_dir)
+        if url in by_url:
+            pages.append(by_url[url])
+        else:
+            pages.append({
+                'url': url,
+                'source': file.as_posix(),
+                'priority': "0.5",
+            })
+    return pages
+
+
+def image_url(src: str) -> str:
+    """Public URL for a responsiveImage src, resolved like the shortcode does"""
+    if src.startswith(("http://", "https://")):
+        return src
+    path = src.lstrip("/")
+    while path.startswith(("../", "./")):
+        path = path.split("/", 1)[1]
+    return f"{BASE_URL}/{quote(path)}"
+
+
+def scan_post_images(file_path: Path) -> List[str]:
+    """Collect the image URLs referenced by a post's responsiveImage shortcodes"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    urls = []
+    for src in RESPONSIVE_IMAGE_PATTERN.findall(content):
+        url = image_url(src)
+        if url not in urls:
+            urls.append(url)
+    return urls
+
+
+def build_image_index(posts_dir: Path = POSTS_DIR) -> Dict[str, List[str]]:
+    """Map each post source to its image URLs.
+
+    Scans are cached by file mtime and size, so unchanged posts are not
+    read again.
+    """
+    try:
+        with open(IMAGE_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+
+    index = {}
+    fresh_cache = {}
+    for file in posts_dir.glob("*.md"):
+        source = file.as_posix()
+        stat = file.stat()
+        key = [stat.st_mtime_ns, stat.st_size]
+        cached = cache.get(source)
+        if cached and cached['key'] == key:
+            images = cached['images']
+        else:
+            images = scan_post_images(file)
+        index[source] = images
+        fresh_cache[source] = {'key': key, 'images': images}
+
+    if fresh_cache != cache:
+        try:
+            CACHE_DIR.mkdir(exist_ok=True)
+            with open(IMAGE_CACHE_FILE, 'w', encoding='utf-8') as f:
+                json.dump(fresh_cache, f)
+        except OSError:
+            pass
+    return index
+
+
+def run_git(*args, timeout=60) -> Optional[str]:
+    """Run a git command and return its stdout, or None if it failed"""
     try:
-        # Try to get last commit date from git
         result = subprocess.run(
-            ['git', 'log', '-1', '--format=%cI', file_path],
+            ['git', '-c', 'core.quotepath=off', *args],
             capture_output=True,
             text=True,
-            timeout=5
+            timeout=timeout
         )
-        if result.returncode == 0 and result.stdout.strip():
-            # Parse ISO format and return just the date
-            date_str = result.stdout.strip()
-            return date_str.split('T')[0]
     except Exception:
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout
+
+
+def walk_git_log(rev_range: str) -> Dict[str, str]:
+    """Map each path touched in rev_range to the date of its newest commit.
+
+    A single `git log --name-only` walk replaces one `git log -1` per file.
+    The log is newest-first, so the first date seen for a path wins.
+    """
+    output = run_git(
+        'log', f'--format={COMMIT_MARKER}%cI', '--name-only', rev_range
+    )
+    dates = {}
+    if not output:
+        return dates
+
+    commit_date = None
+    for line in output.split('\n'):
+        if line.startswith(COMMIT_MARKER):
+            commit_date = line[1:].split('T')[0]
+        elif line and commit_date and line not in dates:
+            dates[line] = commit_date
+    return dates
+
+
+def load_git_index() -> dict:
+    """Load the persisted git date index, or an empty one"""
+    try:
+        with open(GIT_INDEX_FILE, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if isinstance(index.get('dates'), dict):
+            return index
+    except (OSError, ValueError, AttributeError):
         pass
-    
+    return {'head': None, 'dates': {}}
+
+
+def save_git_index(head: str, dates: Dict[str, str]):
+    """Persist the git date index for the given HEAD"""
+    CACHE_DIR.mkdir(exist_ok=True)
+    with open(GIT_INDEX_FILE, 'w', encoding='utf-8') as f:
+        json.dump({'head': head, 'dates': dates}, f)
+
+
+def build_git_date_index() -> Dict[str, str]:
+    """Build the path -> last commit date index for the whole tree.
+
+    The index is cached on disk keyed by HEAD. When the cached HEAD is an
+    ancestor of the current one only the new commits are walked.
+    """
+    head = run_git('rev-parse', 'HEAD', timeout=5)
+    if not head:
+        return {}
+    head = head.strip()
+
+    index = load_git_index()
+    cached_head = index['head']
+    if cached_head == head:
+        return index['dates']
+
+    is_ancestor = cached_head and run_git(
+        'merge-base', '--is-ancestor', cached_head, head, timeout=5
+    ) is not None
+    if is_ancestor:
+        dates = index['dates']
+        dates.update(walk_git_log(f'{cached_head}..{head}'))
+    else:
+        dates = walk_git_log(head)
+
+    try:
+        save_git_index(head, dates)
+    except OSError:
+        pass
+    return dates
+
+
+def get_last_modified(file_path, git_dates=None):
+    """Get last modified date of file from git or filesystem"""
+    if git_dates is None:
+        git_dates = build_git_date_index()
+
+    date_str = git_dates.get(Path(file_path).as_posix())
+    if date_str:
+        return date_str
+
     # Fallback to file modification time
     return datetime.fromtimestamp(
         os.path.getmtime(file_path)
     ).strftime("%Y-%m-%d")
 
-def generate_sitemap():
-    """Generate sitemap.xml"""
-    files = get_html_files()
-    
-    xml = ['<?xml version="1.0" encoding="UTF-8"?>']
-    xml.append('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">')
-    
-    for file in sorted(files):
-        url = f"{BASE_URL}/{file}"
-        lastmod = get_last_modified(file)
-        priority = PRIORITIES.get(file, "0.5")
-        
-        # Blog posts get priority 0.6
-        if "blog/posts/" in file:
-            priority = "0.6"
-        
-        xml.append("  <url>")
-        xml.append(f"    <loc>{url}</loc>")
-        xml.append(f"    <lastmod>{lastmod}</lastmod>")
-        xml.append(f"    <priority>{priority}</priority>")
-        xml.append("  </url>")
-    
-    xml.append("</urlset>")
-    
-    with open(OUTPUT_FILE, "w") as f:
-        f.write("\n".join(xml))
-    
-    print(f"✅ Sitemap generated: {OUTPUT_FILE}")
-    print(f"📊 Total URLs: {len(files)}")
+def site_output_path(url: str, site_dir: Path = SITE_DIR) -> Path:
+    """Rendered _site file that serves a URL path"""
+    path = url.lstrip('/')
+    if not path or path.endswith('/'):
+        path += 'index.html'
+    return site_dir / path
+
+
+def hash_rendered_page(file_path: str) -> Optional[str]:
+    """Hash a rendered page with whitespace runs collapsed.
+
+    Whitespace-only template or rebuild churn therefore keeps the same
+    digest. Returns None when the page has not been rendered.
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            content = f.read()
+    except OSError:
+        return None
+    normalized = WHITESPACE_PATTERN.sub(b' ', content).strip()
+    return hashlib.sha256(normalized).hexdigest()
+
+
+def hash_rendered_pages(paths: List[str]) -> List[Optional[str]]:
+    """Hash rendered pages, across all cores for large sites"""
+    if len(paths) < PARALLEL_HASH_THRESHOLD:
+        return [hash_rendered_page(path) for path in paths]
+    with ProcessPoolExecutor() as executor:
+        return list(executor.map(hash_rendered_page, paths, chunksize=64))
+
+
+def build_content_dates(pages: List[Dict[str, str]], git_dates: Dict[str, str],
+                        site_dir: Path = SITE_DIR) -> Dict[str, str]:
+    """Map page URLs to a lastmod that only moves when rendered output changes.
+
+    A manifest of {url: {digest, lastmod}} is persisted in .cache/. A page
+    whose normalized rendered content hashes the same as last run keeps its
+    recorded lastmod. A page seen for the first time gets its git/filesystem
+    date; a page whose output changed gets the build date, since the change
+    may come from a layout, include or data file rather than its source.
+    Entries for URLs no longer in `pages` are dropped.
+    """
+    try:
+        with open(CONTENT_MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            previous_manifest = json.load(f)
+    except (OSError, ValueError):
+        previous_manifest = {}
+
+    paths = [str(site_output_path(page['url'], site_dir)) for page in pages]
+    digests = hash_rendered_pages(paths)
+    build_date = datetime.now().strftime("%Y-%m-%d")
+
+    manifest = {}
+    content_dates = {}
+    for page, digest in zip(pages, digests):
+        url = page['url']
+        previous = previous_manifest.get(url)
+        if digest is None:
+            # Not rendered this time; keep what is known about the page
+            if previous:
+                manifest[url] = previous
+            continue
+        if previous and previous['digest'] == digest:
+            lastmod = previous['lastmod']
+        elif previous:
+            lastmod = max(build_date, previous['lastmod'])
+        else:
+            lastmod = get_last_modified(page['source'], git_dates)
+        manifest[url] = {'digest': digest, 'lastmod': lastmod}
+        content_dates[url] = lastmod
+
+    CACHE_DIR.mkdir(exist_ok=True)
+    with open(CONTENT_MANIFEST_FILE, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    return content_dates
+
+
+def format_url_entry(page: Dict[str, str], lastmod: str,
+                     images: Iterable[str] = ()) -> str:
+    """Format a single <url> entry with its <image:image> extensions"""
+    image_entries = "".join(
+        "    <image:image>\n"
+        f"      <image:loc>{escape(url)}</image:loc>\n"
+        "    </image:image>\n"
+        for url in images
+    )
+    return (
+        "  <url>\n"
+        f"    <loc>{escape(BASE_URL + page['url'])}</loc>\n"
+        f"    <lastmod>{lastmod}</lastmod>\n"
+        f"    <priority>{page['priority']}</priority>\n"
+        f"{image_entries}"
+        "  </url>\n"
+    )
+
+
+def iter_url_entries(pages: Iterable[Dict[str, str]], git_dates: Dict[str, str],
+                     image_index: Dict[str, List[str]],
+                     content_dates: Optional[Dict[str, str]] = None):
+    """Yield (formatted <url> entry, lastmod) for each page"""
+    content_dates = content_dates or {}
+    for page in pages:
+        lastmod = content_dates.get(page['url'])
+        if lastmod is None:
+            lastmod = get_last_modified(page['source'], git_dates)
+        images = image_index.get(page['source'], ())
+        yield format_url_entry(page, lastmod, images), lastmod
+
+
+def write_urlset(f, entries):
+    """Stream a <urlset> document, one <url> entry at a time"""
+    f.write(URLSET_OPEN)
+    for entry, _ in entries:
+        f.write(entry)
+    f.write(URLSET_CLOSE)
+
+
+class ShardedSitemapWriter:
+    """Stream <url> entries into gzip shards referenced by a sitemap index.
+
+    A shard is rolled over before it would exceed the protocol limits.
+    Each shard is hashed while it is written; when the digest matches the
+    previous run the new file is discarded, so unchanged shards keep their
+    bytes and their index lastmod.
+
+    Use it as a context manager: if writing fails, the shard in progress is
+    closed and its .tmp file removed.
+    """
+
+    def __init__(self, output_dir: Path = Path(".")):
+        self.output_dir = output_dir
+        self.previous = self._load_manifest()
+        self.manifest = {}
+        self.written = []
+        self.unchanged = []
+        self._file = None
+        self._raw = None
+
+    def __enter__(self) -> 'ShardedSitemapWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    @staticmethod
+    def _load_manifest() -> dict:
+        try:
+            with open(SHARD_MANIFEST_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _open_shard(self):
+        self._name = f"sitemap-{len(self.manifest) + 1}.xml.gz"
+        self._tmp_path = self.output_dir / f"{self._name}.tmp"
+        self._raw = open(self._tmp_path, 'wb')
+        try:
+            self._file = gzip.GzipFile(
+                filename='', mode='wb', fileobj=self._raw, mtime=0
+            )
+        except BaseException:
+            self._raw.close()
+            self._tmp_path.unlink(missing_ok=True)
+            self._raw = None
+            raise
+        self._digest = hashlib.sha256()
+        self._urls = 0
+        self._bytes = 0
+        self._lastmod = ''
+        self._write(URLSET_OPEN)
+
+    def _write(self, text: str):
+        data = text.encode('utf-8')
+        self._file.write(data)
+        self._digest.update(data)
+        self._bytes += len(data)
+
+    def _close_shard(self):
+        self._write(URLSET_CLOSE)
+        self._file.close()
+        self._raw.close()
+
+        digest = self._digest.hexdigest()
+        final_path = self.output_dir / self._name
+        previous = self.previous.get(self._name, {})
+        if previous.get('digest') == digest and final_path.exists():
+            self._tmp_path.unlink()
+            self.unchanged.append(self._name)
+        else:
+            os.replace(self._tmp_path, final_path)
+            self.written.append(self._name)
+
+        self.manifest[self._name] = {'digest': digest, 'lastmod': self._lastmod}
+        self._file = None
+        self._raw = None
+
+    def abort(self):
+        """Close and delete the shard being written, after an error"""
+        if self._file is None:
+            return
+        try:
+            self._file.close()
+        except OSError:
+            pass  # e.g. the disk filled up; the shard is discarded anyway
+        finally:
+            self._raw.close()
+            self._tmp_path.unlink(missing_ok=True)
+            self._file = None
+            self._raw = None
+
+    def add(self, entry: str, lastmod: str):
+        """Append a formatted <url> entry, rolling over to a new shard if needed"""
+        size = len(entry.encode('utf-8'))
+        if self._file is not None and (
+            self._urls >= MAX_SHARD_URLS
+            or self._bytes + size + len(URLSET_CLOSE) > MAX_SHARD_BYTES
+        ):
+            self._close_shard()
+        if self._file is None:
+            self._open_shard()
+
+        self._write(entry)
+        self._urls += 1
+        self._lastmod = max(self._lastmod, lastmod)
+
+    def close(self):
+        """Finish the last shard, drop stale ones and write the sitemap index"""
+        if self._file is not None:
+            self._close_shard()
+
+        for name in self.previous.keys() - self.manifest.keys():
+            (self.output_dir / name).unlink(missing_ok=True)
+
+        with open(self.output_dir / INDEX_FILE, 'w', encoding='utf-8') as f:
+            f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+            f.write(
+                '<sitemapindex '
+                'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+            )
+            for name, shard in self.manifest.items():
+                f.write(
+                    "  <sitemap>\n"
+                    f"    <loc>{escape(f'{BASE_URL}/{name}')}</loc>\n"
+                    f"    <lastmod>{shard['lastmod']}</lastmod>\n"
+                    "  </sitemap>\n"
+                )
+            f.write("</sitemapindex>")
+
+        CACHE_DIR.mkdir(exist_ok=True)
+        with open(SHARD_MANIFEST_FILE, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f)
+
+
+def write_sharded(entries, output_dir: Path = Path(".")) -> ShardedSitemapWriter:
+    """Stream <url> entries into gzip shards plus sitemap_index.xml"""
+    with ShardedSitemapWriter(output_dir) as writer:
+        for entry, lastmod in entries:
+            writer.add(entry, lastmod)
+    return writer
+
+
+def generate_sitemap(source="pages", sharded=False, content_hash=False):
+    """Generate sitemap.xml, or a sharded sitemap index"""
+    with phase("discover"):
+        if source == "site":
+            pages = get_site_pages()
+        else:
+            pages = get_source_pages()
+        pages.sort(key=lambda page: page['url'])
+    with phase("read"):
+        git_dates = build_git_date_index()
+        image_index = build_image_index()
+        content_dates = None
+        if content_hash:
+            content_dates = build_content_dates(pages, git_dates)
+    entries = iter_url_entries(pages, git_dates, image_index, content_dates)
+
+    with phase("report"):
+        if sharded:
+            writer = write_sharded(entries)
+            print(f"✅ Sitemap index generated: {INDEX_FILE}")
+            print(
+                f"🗂️  Shards: {len(writer.written)} written, "
+                f"{len(writer.unchanged)} unchanged"
+            )
+        else:
+            with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+                write_urlset(f, entries)
+            print(f"✅ Sitemap generated: {OUTPUT_FILE}")
+
+    print(f"📊 Total URLs: {len(pages)}")
     print(f"\nSitemap includes:")
     
     # Count by category
-    root_pages = [f for f in files if "/" not in f]
-    blog_posts = [f for f in files if "blog/posts/" in f]
+    blog_posts = [p for p in pages if p['priority'] == "0.6"]
     
-    print(f"  - {len(root_pages)} root pages")
+    print(f"  - {len(pages) - len(blog_posts)} site pages")
     print(f"  - {len(blog_posts)} blog posts")
+    print(f"  - {sum(map(len, image_index.values()))} images")
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Generate sitemap.xml")
+    parser.add_argument(
+        "--source",
+        choices=["pages", "site"],
+        default="pages",
+        help="Build the URL list from template front matter (pages) "
+             "or by walking the built _site output (site)",
+    )
+    parser.add_argument(
+        "--sharded",
+        action="store_true",
+        help=f"Write gzip sitemap-N.xml.gz shards and {INDEX_FILE} "
+             "instead of a single sitemap.xml",
+    )
+    parser.add_argument(
+        "--content-hash",
+        action="store_true",
+        help="Only advance lastmod when a page's rendered _site output "
+             "changed (run after the Eleventy build)",
+    )
+    add_arguments(parser)
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
-    generate_sitemap()
+    args = parse_args()
+    with instrumented(args, "generate_sitemap"):
+        generate_sitemap(args.source, args.sharded, args.content_hash)
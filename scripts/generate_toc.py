@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Generate per-post table-of-contents data for the blog post layout.
+
+Each post in blog/posts-md is tokenized once and its headings are turned
+into a compact TOC (id, level, text). Headings without an id get a slug,
+listed in `missing_ids` in document order so the Eleventy build can add
+the ids the TOC links point at. The result is written to _data/toc.json,
+keyed by the post URL, for blog-post.njk to inline at build time.
+
+TOCs are cached in .cache/ by the content hash of the post, so only new or
+edited posts are parsed again.
+
+Usage:
+    uv run python scripts/generate_toc.py
+"""
+
+import argparse
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from generate_sitemap import CACHE_DIR, POSTS_DIR, default_permalink, read_front_matter
+from html_document import HEADING_TAGS, parse_document
+from instrumentation import add_arguments, instrumented, phase
+
+INCLUDES_DIR = Path("_includes")
+OUTPUT_FILE = Path("_data/toc.json")
+TOC_CACHE_FILE = CACHE_DIR / "toc.json"
+# Bump when the TOC format changes so cached entries are not reused
+TOC_VERSION = "2"
+# Shorter posts do not get a table of contents
+MIN_TOC_HEADINGS = 3
+
+# Markdown `## Heading` lines (outside fenced code blocks)
+ATX_HEADING = re.compile(r'^(#{1,6})[ \t]+(.+?)[ \t#]*$', re.MULTILINE)
+CODE_FENCE = re.compile(r'^(```|~~~)', re.MULTILINE)
+# Raw HTML <pre> blocks are passed through by markdown, `#` lines included
+PRE_BLOCK = re.compile(r'<pre\b.*?</pre>', re.IGNORECASE | re.DOTALL)
+MARKDOWN_LINK = re.compile(r'\[([^\]]*)\]\([^)]*\)')
+SLUG_STRIP = re.compile(r'[^\w\s-]')
+SLUG_SPACES = re.compile(r'[\s_-]+')
+ID_ATTRIBUTE = re.compile(r'\bid="([^"{}]+)"')
+
+
+def slugify(text: str) -> str:
+    """URL fragment for a heading's text."""
+    slug = SLUG_SPACES.sub('-', SLUG_STRIP.sub('', text.lower())).strip('-')
+    return slug or 'section'
+
+
+def split_body(text: str) -> str:
+    """Post body without its front matter."""
+    if not text.startswith('---'):
+        return text
+    end = text.find('\n---', 3)
+    if end == -1:
+        return text
+    return text[text.find('\n', end + 4) + 1:]
+
+
+def markdown_headings(body: str) -> List[Dict]:
+    """ATX headings in a markdown body, as {'level', 'text', 'offset'}."""
+    fences = [match.start() for match in CODE_FENCE.finditer(body)]
+    pre_blocks = [match.span() for match in PRE_BLOCK.finditer(body)]
+    headings = []
+    for match in ATX_HEADING.finditer(body):
+        # Inside a code block when an odd number of fences precede it
+        if sum(1 for fence in fences if fence < match.start()) % 2:
+            continue
+        if any(start < match.start() < end for start, end in pre_blocks):
+            continue
+        text = MARKDOWN_LINK.sub(r'\1', match.group(2))
+        text = ' '.join(text.replace('*', '').replace('`', '').split())
+        headings.append({
+            'level': len(match.group(1)),
+            'text': text[:80] or None,
+            'offset': match.start(),
+            'id': None,
+        })
+    return headings
+
+
+def layout_ids() -> set:
+    """Ids used by the layouts and partials, which slugs must not reuse."""
+    return {
+        element_id
+        for template in INCLUDES_DIR.rglob('*.njk')
+        for element_id in ID_ATTRIBUTE.findall(template.read_text(encoding='utf-8'))
+    }
+
+
+def build_toc(body: str, reserved_ids: set = frozenset()) -> Optional[Dict]:
+    """TOC for a post body, or None when it has too few headings."""
+    document = parse_document(body)
+    by_offset = {heading['offset']: heading for heading in document.headings}
+
+    # Every heading element in order, so missing ids line up with the
+    # headings the build adds them to
+    elements = []
+    for tag in document.start_tags(*HEADING_TAGS):
+        heading = by_offset.get(tag.offset)
+        elements.append({
+            'level': HEADING_TAGS[tag.name],
+            'text': heading['text'] if heading else None,
+            'offset': tag.offset,
+            'id': tag.attrs.get('id'),
+        })
+    elements.extend(markdown_headings(body))
+    elements.sort(key=lambda element: element['offset'])
+
+    used = set(document.ids) | set(reserved_ids)
+    headings = []
+    missing_ids = []
+    for element in elements:
+        element_id = element['id']
+        generated = None
+        if not element_id and element['text']:
+            slug = base = slugify(element['text'])
+            suffix = 2
+            while slug in used:
+                slug = f"{base}-{suffix}"
+                suffix += 1
+            used.add(slug)
+            element_id = generated = slug
+        missing_ids.append(generated)
+        if element['text']:
+            headings.append({
+                'id': element_id,
+                'level': element['level'],
+                'text': element['text'],
+            })
+
+    if len(headings) < MIN_TOC_HEADINGS:
+        return None
+    toc = {'headings': headings}
+    if any(missing_ids):
+        toc['missing_ids'] = missing_ids
+    return toc
+
+
+def load_cache(path: Path, reserved_ids: set) -> Dict:
+    """Content hash -> TOC entries from the last run.
+
+    Entries are dropped when the format or the layout ids changed, since
+    either can change the generated slugs.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get('version') != TOC_VERSION \
+            or cache.get('layout_ids') != sorted(reserved_ids):
+        return {}
+    return cache.get('entries', {})
+
+
+def generate_toc(output: Path = OUTPUT_FILE, cache_file: Path = TOC_CACHE_FILE):
+    """Write TOC data for every post, parsing only changed posts."""
+    entries = {}
+    tocs = {}
+    parsed = 0
+
+    with phase("discover"):
+        posts = sorted(POSTS_DIR.glob('*.md'))
+        reserved_ids = layout_ids()
+    cache = load_cache(cache_file, reserved_ids)
+
+    for post in posts:
+        with phase("read"):
+            data = post.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        if digest in cache:
+            toc = cache[digest]
+        else:
+            with phase("check"):
+                toc = build_toc(split_body(data.decode('utf-8')), reserved_ids)
+            parsed += 1
+        entries[digest] = toc
+        if toc:
+            url = read_front_matter(post).get('permalink') or default_permalink(post)
+            tocs[url] = toc
+
+    with phase("report"):
+        text = json.dumps(tocs, indent=1, ensure_ascii=False) + "\n"
+        # Leave the file untouched when nothing changed, so watchers stay idle
+        if not output.exists() or output.read_text(encoding='utf-8') != text:
+            output.parent.mkdir(parents=True, exist_ok=True)
+            output.write_text(text, encoding='utf-8')
+
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': TOC_VERSION,
+                'layout_ids': sorted(reserved_ids),
+                'entries': entries,
+            }, f)
+
+    print(f"✅ TOC data generated: {output}")
+    print(f"📑 {len(tocs)} of {len(posts)} posts have a table of contents")
+    print(f"🔄 {parsed} parsed, {len(posts) - parsed} unchanged")
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Generate per-post TOC data")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=OUTPUT_FILE,
+        help=f"JSON file to write (default: {OUTPUT_FILE})",
+    )
+    add_arguments(parser)
+    return parser.parse_args()
+
+
+def main():
+    """Main entry point."""
+    args = parse_args()
+    with instrumented(args, "generate_toc"):
+        generate_toc(args.output)
+
+
+if __name__ == "__main__":
+    main()
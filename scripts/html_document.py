@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+"""
+Shared parse-once HTML document model for the audit scripts.
+
+Each page is read and tokenized a single time into an HtmlDocument
+(tags, attributes, text spans, headings, title, and an index of element
+ids and the id references made by for, aria-* and href="#fragment"
+attributes). The accessibility, heading and source checkers all consume
+that model instead of re-reading and re-parsing the file themselves.
+
+Consumers that only need structured data use find_json_ld() instead,
+which locates the JSON-LD <script> blocks with case-insensitive searches and
+returns each body with its offset, so decoding errors can be reported at
+a line and column of the page.
+
+Top-level <nav> and <footer> subtrees are usually identical across
+pages (the site chrome from _includes/partials). Each one is
+fingerprinted by hashing its source; a subtree already seen in this
+process is not re-parsed, its recorded events are replayed instead, and
+document.fragments tells the checkers which tag ranges they may answer
+from their own per-fingerprint caches.
+
+Usage:
+    from html_document import load_document
+
+    document = load_document(Path("_site/index.html"))
+    for heading in document.headings:
+        print(heading['level'], heading['text'], heading['offset'])
+"""
+
+import hashlib
+import re
+from bisect import bisect_right
+from collections import OrderedDict
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import unquote
+
+from instrumentation import phase
+
+HEADING_TAGS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+JSON_LD_TYPE = 'application/ld+json'
+# Attributes whose value is a space-separated list of element ids
+ID_LIST_ATTRS = ('aria-labelledby', 'aria-describedby')
+# Top-level subtrees that are fingerprinted as shared site chrome. <head>
+# is left out: its title, canonical URL and JSON-LD differ on every page.
+CHROME_START = re.compile(r'<(nav|footer)[\s>]', re.IGNORECASE)
+# Tag names are case-insensitive, so <Script> and </SCRIPT> count too
+SCRIPT_OPEN = re.compile('<script', re.IGNORECASE)
+SCRIPT_CLOSE = re.compile('</script', re.IGNORECASE)
+COMMENT_OPEN = re.compile('<!--')
+FRAGMENT_CACHE_SIZE = 64
+# One attribute of an opening tag: name, then a double-, single- or unquoted value
+TAG_ATTRIBUTE = re.compile(
+    r'''\s*([^\s"'=<>/]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]*)))?'''
+)
+
+
+class Tag(NamedTuple):
+    """A start or end tag event, in document order."""
+    name: str
+    attrs: Dict[str, Optional[str]]
+    offset: int
+    end: bool = False
+
+
+class TextSpan(NamedTuple):
+    """A run of character data and the offset where it starts."""
+    offset: int
+    text: str
+
+
+class Reference(NamedTuple):
+    """An attribute pointing at an element id (for, aria-*, href="#...")."""
+    attr: str
+    target: str
+    offset: int
+
+
+class JsonLdBlock(NamedTuple):
+    """The raw body of a JSON-LD <script> and the offset where it starts."""
+    text: str
+    offset: int
+
+
+class Fragment(NamedTuple):
+    """A chrome subtree's parse events, with offsets relative to its start."""
+    tags: List[Tag]
+    text: List[TextSpan]
+    headings: List[Dict]
+    title: Optional[str]
+    ids: List[Tuple[str, int]]
+    anchor_names: List[str]
+    references: List[Reference]
+
+
+class FragmentCache:
+    """Small LRU map from subtree fingerprint to a cached value.
+
+    Shared chrome is looked up on every page and stays cached, while
+    one-off subtrees (e.g. a page-specific breadcrumb <nav>) are evicted.
+    """
+
+    def __init__(self, size: int = FRAGMENT_CACHE_SIZE):
+        self.size = size
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, key) -> Optional[Any]:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+
+_fragments = FragmentCache()
+
+
+class HtmlDocument:
+    """Compact, already-parsed view of a single HTML page."""
+
+    def __init__(self, path: Optional[Path], source: str):
+        self.path = path
+        self.source = source
+        self.tags: List[Tag] = []
+        self.text: List[TextSpan] = []
+        self.headings: List[Dict] = []
+        self.title: Optional[str] = None
+        # id -> offsets of every element carrying it, in document order
+        self.ids: Dict[str, List[int]] = {}
+        # <a name> anchors, which are also valid fragment targets
+        self.anchor_names: Set[str] = set()
+        self.references: List[Reference] = []
+        # (first tag index, end tag index, fingerprint) of each chrome subtree
+        self.fragments: List[Tuple[int, int, str]] = []
+        self._line_starts = [0] + [m.end() for m in re.finditer('\n', source)]
+
+    def offset(self, line: int, column: int) -> int:
+        """Convert a 1-based line and 0-based column to a source offset."""
+        return self._line_starts[line - 1] + column
+
+    def line_of(self, offset: int) -> int:
+        """1-based line number containing a source offset."""
+        return bisect_right(self._line_starts, offset)
+
+    def start_tags(self, *names: str) -> List[Tag]:
+        """All start tags, optionally restricted to the given names."""
+        return [
+            tag for tag in self.tags
+            if not tag.end and (not names or tag.name in names)
+        ]
+
+
+class _DocumentParser(HTMLParser):
+    """Single HTMLParser pass that fills an HtmlDocument."""
+
+    def __init__(self, document: HtmlDocument):
+        super().__init__()
+        self.document = document
+        self._heading = None
+        self._heading_text = []
+        self._heading_offset = 0
+        self._heading_label = None
+        self._title = None
+        self._base = (1, 0)
+        self._id_events: List[Tuple[str, int]] = []
+        self._anchor_events: List[str] = []
+
+    def _offset(self) -> int:
+        line, column = self.getpos()
+        base_line, base_column = self._base
+        if line == 1:
+            column += base_column
+        return self.document.offset(base_line + line - 1, column)
+
+    def restart(self, position: int):
+        """Flush pending text and continue parsing fresh from a source offset."""
+        self.close()
+        self.reset()
+        line = self.document.line_of(position)
+        self._base = (line, position - self.document.offset(line, 0))
+
+    def at_boundary(self) -> bool:
+        """True between complete elements, where the source can be split."""
+        return (
+            self.cdata_elem is None and '<' not in self.rawdata
+            and self._heading is None and self._title is None
+        )
+
+    def mark(self) -> Tuple[int, ...]:
+        """Current length of every event list, to capture a fragment from."""
+        document = self.document
+        return (
+            len(document.tags), len(document.text), len(document.headings),
+            len(self._id_events), len(self._anchor_events), len(document.references),
+        )
+
+    def capture(self, mark: Tuple[int, ...], start: int, title) -> Fragment:
+        """Events recorded since mark, rebased to a fragment starting at start."""
+        document = self.document
+        tags, text, headings, ids, anchors, references = mark
+        return Fragment(
+            [tag._replace(offset=tag.offset - start) for tag in document.tags[tags:]],
+            [span._replace(offset=span.offset - start)
+             for span in document.text[text:]],
+            [{**heading, 'offset': heading['offset'] - start}
+             for heading in document.headings[headings:]],
+            title,
+            [(element_id, offset - start)
+             for element_id, offset in self._id_events[ids:]],
+            self._anchor_events[anchors:],
+            [ref._replace(offset=ref.offset - start)
+             for ref in document.references[references:]],
+        )
+
+    def replay(self, fragment: Fragment, start: int):
+        """Append a cached fragment's events as if it had been parsed at start."""
+        document = self.document
+        document.tags.extend(
+            tag._replace(offset=tag.offset + start) for tag in fragment.tags
+        )
+        document.text.extend(
+            span._replace(offset=span.offset + start) for span in fragment.text
+        )
+        document.headings.extend(
+            {**heading, 'offset': heading['offset'] + start}
+            for heading in fragment.headings
+        )
+        if document.title is None:
+            document.title = fragment.title
+        for element_id, offset in fragment.ids:
+            document.ids.setdefault(element_id, []).append(offset + start)
+        document.anchor_names.update(fragment.anchor_names)
+        document.references.extend(
+            ref._replace(offset=ref.offset + start) for ref in fragment.references
+        )
+
+    def _index_ids(self, tag, attrs, offset):
+        """Record the ids a tag defines and the ids it refers to."""
+        document = self.document
+        element_id = attrs.get('id')
+        if element_id:
+            document.ids.setdefault(element_id, []).append(offset)
+            self._id_events.append((element_id, offset))
+        if tag == 'a':
+            if attrs.get('name'):
+                document.anchor_names.add(attrs['name'])
+                self._anchor_events.append(attrs['name'])
+            href = attrs.get('href') or ''
+            if href.startswith('#') and len(href) > 1:
+                document.references.append(
+                    Reference('href', unquote(href[1:]), offset)
+                )
+        elif tag == 'label' and attrs.get('for'):
+            document.references.append(Reference('for', attrs['for'], offset))
+        for attr in ID_LIST_ATTRS:
+            for target in (attrs.get(attr) or '').split():
+                document.references.append(Reference(attr, target, offset))
+
+    def handle_starttag(self, tag, attrs):
+        offset = self._offset()
+        attrs_dict = dict(attrs)
+        self.document.tags.append(Tag(tag, attrs_dict, offset))
+        self._index_ids(tag, attrs_dict, offset)
+
+        if tag in HEADING_TAGS:
+            # A heading start tag implicitly closes an unclosed heading
+            self.close_heading()
+            self._heading = HEADING_TAGS[tag]
+            self._heading_text = []
+            self._heading_offset = offset
+            self._heading_label = attrs_dict.get('aria-label')
+        elif tag == 'img' and self._heading is not None:
+            self._heading_text.append(f" {attrs_dict.get('alt') or ''} ")
+        elif tag == 'title' and self.document.title is None:
+            self._title = []
+
+    def handle_startendtag(self, tag, attrs):
+        offset = self._offset()
+        attrs_dict = dict(attrs)
+        self.document.tags.append(Tag(tag, attrs_dict, offset))
+        self._index_ids(tag, attrs_dict, offset)
+
+        if tag == 'img' and self._heading is not None:
+            self._heading_text.append(f" {attrs_dict.get('alt') or ''} ")
+
+    def close_heading(self):
+        """Record the open heading, if any (text from its data and img alts)."""
+        if self._heading is None:
+            return
+        text = ' '.join(''.join(self._heading_text).split()) or self._heading_label
+        if text:  # Only include non-empty headings
+            self.document.headings.append({
+                'level': self._heading,
+                'text': text[:80],  # Truncate long headings
+                'offset': self._heading_offset,
+            })
+        self._heading = None
+
+    def handle_endtag(self, tag):
+        self.document.tags.append(Tag(tag, {}, self._offset(), end=True))
+
+        # Any heading end tag closes the open heading, as in HTML parsing
+        if tag in HEADING_TAGS:
+            self.close_heading()
+        elif tag == 'title' and self._title is not None:
+            self.document.title = ' '.join(''.join(self._title).split())
+            self._title = None
+
+    def handle_data(self, data):
+        # <script> and <style> bodies (JSON-LD included) are not page text
+        if self.cdata_elem is not None:
+            return
+        if self._heading is not None:
+            self._heading_text.append(data)
+        if self._title is not None:
+            self._title.append(data)
+        if data.strip():
+            self.document.text.append(TextSpan(self._offset(), data))
+
+
+def find_chrome(source: str):
+    """Yield (start, end) of top-level <nav> and <footer> subtrees."""
+    position = 0
+    while True:
+        match = CHROME_START.search(source, position)
+        if not match:
+            return
+        name = match.group(1).lower()
+        close = re.compile(rf'</{name}\s*>', re.IGNORECASE).search(source, match.end())
+        if not close:
+            return
+        # Nested subtrees of the same kind are not split out
+        inner = source[match.end():close.start()]
+        if not re.search(rf'<{name}[\s>]', inner, re.IGNORECASE):
+            yield match.start(), close.end()
+        position = close.end()
+
+
+def _finder(source: str, pattern: re.Pattern):
+    """Offset of the next match of pattern at or after start, or -1.
+
+    The source is searched again only once the scan has passed the last
+    hit, so repeated calls with increasing starts stay linear in its size.
+    """
+    hit = -2
+
+    def find(start: int) -> int:
+        nonlocal hit
+        if hit != -1 and hit < start:
+            match = pattern.search(source, start)
+            hit = match.start() if match else -1
+        return hit
+
+    return find
+
+
+def tag_attributes(source: str, position: int) -> Tuple[Dict[str, str], int]:
+    """Attributes of the opening tag whose name ends at position.
+
+    Returns the attributes (names lowercased, first occurrence wins) and
+    the offset just past the tag's '>', or -1 when the tag is unterminated.
+    """
+    attrs: Dict[str, str] = {}
+    while True:
+        match = TAG_ATTRIBUTE.match(source, position)
+        if not match:
+            break
+        value = next((group for group in match.groups()[1:] if group is not None), '')
+        attrs.setdefault(match.group(1).lower(), value)
+        position = match.end()
+    end = source.find('>', position)
+    return attrs, end + 1 if end != -1 else -1
+
+
+def find_json_ld(source: str) -> List[JsonLdBlock]:
+    """Locate the JSON-LD <script> blocks of a page without tokenizing it.
+
+    Jumps from one <script to the next with a regex search, reads only the
+    opening tag's attributes, and slices out the body of each block whose
+    type is application/ld+json (in any case, with or without parameters,
+    quoted or not). Other scripts and <!-- comments --> are skipped whole.
+    """
+    find_script = _finder(source, SCRIPT_OPEN)
+    find_close = _finder(source, SCRIPT_CLOSE)
+    find_comment = _finder(source, COMMENT_OPEN)
+    blocks = []
+    position = 0
+    while True:
+        start = find_script(position)
+        if start == -1:
+            break
+        comment = find_comment(position)
+        if comment != -1 and comment < start:
+            end = source.find('-->', comment + 4)
+            if end == -1:
+                break
+            position = end + 3
+            continue
+
+        name_end = start + len('<script')
+        if name_end < len(source) and source[name_end] not in ' \t\n\r\f/>':
+            position = name_end  # e.g. <scripts> is another element
+            continue
+        attrs, body_start = tag_attributes(source, name_end)
+        if body_start == -1:
+            break
+        body_end = find_close(body_start)
+        if body_end == -1:
+            body_end = len(source)
+        media_type = attrs.get('type', '').split(';')[0].strip().lower()
+        if media_type == JSON_LD_TYPE:
+            blocks.append(JsonLdBlock(source[body_start:body_end], body_start))
+        position = body_end + len('</script')
+    return blocks
+
+
+def source_position(source: str, offset: int) -> Tuple[int, int]:
+    """1-based line and column of a source offset."""
+    line_start = source.rfind('\n', 0, offset) + 1
+    return source.count('\n', 0, offset) + 1, offset - line_start + 1
+
+
+def parse_document(source: str, path: Optional[Path] = None) -> HtmlDocument:
+    """Tokenize HTML source into an HtmlDocument.
+
+    Chrome subtrees already parsed in this process are replayed from the
+    fragment cache instead of being tokenized again.
+    """
+    with phase("parse"):
+        document = HtmlDocument(path, source)
+        parser = _DocumentParser(document)
+        position = 0
+        for start, end in find_chrome(source):
+            parser.feed(source[position:start])
+            position = start
+            if not parser.at_boundary():
+                continue
+
+            parser.restart(start)
+            digest = hashlib.sha1(source[start:end].encode('utf-8')).hexdigest()
+            first_tag = len(document.tags)
+            fragment = _fragments.get(digest)
+            if fragment is not None:
+                parser.replay(fragment, start)
+            else:
+                mark = parser.mark()
+                had_title = document.title is not None
+                parser.feed(source[start:end])
+            parser.restart(end)
+            if fragment is None and parser.at_boundary():
+                title = None if had_title else document.title
+                _fragments.put(digest, parser.capture(mark, start, title))
+            document.fragments.append((first_tag, len(document.tags), digest))
+            position = end
+
+        parser.feed(source[position:])
+        parser.close()
+        parser.close_heading()
+    return document
+
+
+def load_document(path: Path) -> HtmlDocument:
+    """Read and tokenize an HTML file once."""
+    with phase("read"), open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    return parse_document(source, path)
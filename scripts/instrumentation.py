@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Shared --profile / --timings instrumentation for the scripts/ entry points.
+
+`--profile` writes a cProfile dump for the whole run. `--timings` writes a
+JSON summary with per-phase wall and CPU times (discover, read, parse,
+check, report) and the peak memory of the process, so CI can graph it.
+
+Phases nest: time spent in an inner phase (e.g. parse inside check) is
+charged to the inner phase only, so the phase times add up to the total.
+Time outside every phase is reported as "other". When neither flag is
+given, phase() is a no-op.
+
+Usage:
+    from instrumentation import add_arguments, instrumented, phase
+
+    parser = argparse.ArgumentParser()
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    with instrumented(args, "check_accessibility"):
+        with phase("discover"):
+            html_files = find_html_files()
+"""
+
+import cProfile
+import json
+import resource
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Dict, Optional
+
+PHASES = ("discover", "read", "parse", "check", "report")
+
+
+def peak_memory_mb() -> float:
+    """Peak resident memory of this process in MB."""
+    try:
+        with open('/proc/self/status', 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+class PhaseTimer:
+    """Accumulates exclusive wall and CPU time per named phase."""
+
+    def __init__(self):
+        self.phases: Dict[str, Dict[str, float]] = {}
+        self._stack = ["other"]
+        self._started = self._mark = (time.perf_counter(), time.process_time())
+
+    def _charge(self):
+        now = (time.perf_counter(), time.process_time())
+        totals = self.phases.setdefault(
+            self._stack[-1], {"wall": 0.0, "cpu": 0.0, "calls": 0}
+        )
+        totals["wall"] += now[0] - self._mark[0]
+        totals["cpu"] += now[1] - self._mark[1]
+        self._mark = now
+
+    @contextmanager
+    def phase(self, name: str):
+        """Charge the time spent inside the block to `name`."""
+        self._charge()
+        self._stack.append(name)
+        try:
+            yield
+        finally:
+            self._charge()
+            self.phases[name]["calls"] += 1
+            self._stack.pop()
+
+    def summary(self, script: str) -> Dict:
+        """JSON-ready timing summary."""
+        self._charge()
+        ordered = sorted(
+            self.phases.items(),
+            key=lambda item: (PHASES + (item[0],)).index(item[0]),
+        )
+        return {
+            "script": script,
+            "phases": {
+                name: {
+                    "wall_seconds": round(totals["wall"], 6),
+                    "cpu_seconds": round(totals["cpu"], 6),
+                    "calls": totals["calls"],
+                }
+                for name, totals in ordered
+            },
+            "total": {
+                "wall_seconds": round(self._mark[0] - self._started[0], 6),
+                "cpu_seconds": round(self._mark[1] - self._started[1], 6),
+            },
+            "peak_memory_mb": round(peak_memory_mb(), 1),
+        }
+
+
+_active: Optional[PhaseTimer] = None
+
+
+def phase(name: str):
+    """Time a block as `name` when --timings is active, otherwise do nothing."""
+    if _active is None:
+        return nullcontext()
+    return _active.phase(name)
+
+
+def add_arguments(parser):
+    """Add --profile and --timings to an argparse parser."""
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        metavar="FILE",
+        help="Write a cProfile dump (default: <script>.prof)",
+    )
+    parser.add_argument(
+        "--timings",
+        nargs="?",
+        const="-",
+        metavar="FILE",
+        help="Write per-phase wall/CPU times and peak memory as JSON "
+             "(default: stderr)",
+    )
+
+
+def write_timings(summary: Dict, destination: str):
+    """Write a timing summary to a file, or to stderr for '-'."""
+    text = json.dumps(summary, indent=2)
+    if destination == "-":
+        print(text, file=sys.stderr)
+    else:
+        Path(destination).write_text(text + "\n", encoding="utf-8")
+
+
+@contextmanager
+def instrumented(args, script: str):
+    """Profile and/or time the enclosed run according to the parsed args."""
+    global _active
+    profile_path = getattr(args, "profile", None)
+    timings_path = getattr(args, "timings", None)
+
+    profiler = cProfile.Profile() if profile_path is not None else None
+    if timings_path is not None:
+        _active = PhaseTimer()
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(profile_path or f"{script}.prof")
+        if _active is not None:
+            write_timings(_active.summary(script), timings_path)
+            _active = None
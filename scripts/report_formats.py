@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Streaming machine-readable output for the audit scripts.
+
+`--format ndjson` writes one JSON object per checked file as soon as it
+has been checked. `--format sarif` writes a SARIF 2.1.0 log that code
+scanning tools (e.g. GitHub code scanning) can ingest; results are
+streamed into the log's results array, so memory stays flat however many
+pages are checked. Issues are {'rule': rule id, 'message': text} records,
+with a 'line' when the checker knows where the issue is.
+
+Usage:
+    from report_formats import add_format_argument, open_writer
+
+    with open_writer(args.format, "check_accessibility", RULES) as writer:
+        for result in results:
+            writer.write(result['file'], result['issues'])
+"""
+
+import heapq
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+FORMATS = ("text", "ndjson", "sarif")
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+
+def add_format_argument(parser):
+    """Add --format to an argparse parser."""
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default="text",
+        help="Output format: human-readable report (text), one JSON object "
+             "per file (ndjson) or a SARIF 2.1.0 log (sarif)",
+    )
+
+
+class NdjsonWriter:
+    """Write one JSON line per checked file."""
+
+    def __init__(self, tool: str, rules: Dict[str, str], stream=None):
+        self.stream = stream or sys.stdout
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, path: Path, issues: List[Dict], **fields):
+        """Write a file's findings, plus any extra per-file fields."""
+        record = {'file': str(path), **fields, 'issues': issues}
+        self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def close(self):
+        self.stream.flush()
+
+
+class SarifWriter(NdjsonWriter):
+    """Stream findings into a single-run SARIF 2.1.0 log."""
+
+    def __init__(self, tool: str, rules: Dict[str, str], stream=None):
+        super().__init__(tool, rules, stream)
+        self.rule_index = {rule_id: i for i, rule_id in enumerate(rules)}
+        self.count = 0
+        driver = {
+            "name": tool,
+            "rules": [
+                {"id": rule_id, "shortDescription": {"text": label}}
+                for rule_id, label in rules.items()
+            ],
+        }
+        # Everything up to the results array; results are appended as they come
+        header = json.dumps({
+            "$schema": SARIF_SCHEMA,
+            "version": "2.1.0",
+            "runs": [{"tool": {"driver": driver}, "results": []}],
+        }, ensure_ascii=False)
+        self.stream.write(header[:-len("]}]}")] + "\n")
+
+    def write(self, path: Path, issues: List[Dict], **fields):
+        """Write a SARIF result for each issue found in a file."""
+        uri = Path(path).as_posix()
+        for issue in issues:
+            location = {"artifactLocation": {"uri": uri}}
+            if issue.get('line'):
+                location["region"] = {"startLine": issue['line']}
+            result = {
+                "ruleId": issue['rule'],
+                "ruleIndex": self.rule_index[issue['rule']],
+                "level": "warning",
+                "message": {"text": issue['message']},
+                "locations": [{"physicalLocation": location}],
+            }
+            separator = ",\n" if self.count else ""
+            self.stream.write(separator + json.dumps(result, ensure_ascii=False))
+            self.count += 1
+
+    def close(self):
+        self.stream.write("\n]}]}\n")
+        super().close()
+
+
+def open_writer(fmt: str, tool: str, rules: Dict[str, str], stream=None):
+    """Streaming writer for a machine-readable format."""
+    writer_class = SarifWriter if fmt == "sarif" else NdjsonWriter
+    return writer_class(tool, rules, stream)
+
+
+class TopResults:
+    """Keep the n results with the most issues without sorting them all.
+
+    Ties keep their arrival order, as a stable sort would.
+    """
+
+    def __init__(self, n: int = 10):
+        self.n = n
+        self._heap = []
+        self._seen = 0
+
+    def add(self, score: int, item):
+        """Offer an item; only the n highest-scoring are kept."""
+        entry = (score, -self._seen, item)
+        self._seen += 1
+        if len(self._heap) < self.n:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self) -> List:
+        """Kept items, highest score first."""
+        return [item for _, _, item in sorted(self._heap, reverse=True)]
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Indexed Schema.org vocabulary for validate_schema.py.
+
+The vocabulary is the Schema.org release vendored unmodified as
+schemaorg-current-https.jsonld (version SCHEMAORG_VERSION, from
+schema.org/docs/developers.html; CC BY-SA 3.0), so validation works
+offline. It is compiled into an index where every class has an integer
+id and:
+
+- ancestors[id] is a bitmask of the class and all its superclasses
+- domains[property] is a bitmask of every class the property is valid on
+  (its domainIncludes classes and all their subclasses)
+- ranges[property] is the same for its rangeIncludes classes
+
+so "is X a subtype of Y" and "is property P valid on type T" are a shift
+and a mask. The index is cached in .cache/ as a marshal file keyed by the
+vocabulary's content hash, so later runs load it without reading the
+JSON-LD graph again.
+
+To update, replace the file with a newer schemaorg-current-https.jsonld
+and bump SCHEMAORG_VERSION; the cached index is rebuilt automatically.
+
+Usage:
+    from schema_vocabulary import load_vocabulary
+
+    vocabulary = load_vocabulary()
+    vocabulary.is_subtype("CollegeOrUniversity", "Organization")  # True
+    vocabulary.property_valid("alumniOf", ["Person"])            # True
+"""
+
+import hashlib
+import json
+import marshal
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from instrumentation import phase
+
+VOCABULARY_FILE = Path(__file__).with_name("schemaorg-current-https.jsonld")
+# Schema.org release of VOCABULARY_FILE
+SCHEMAORG_VERSION = "12.0"
+CACHE_DIR = Path(".cache")
+INDEX_CACHE_FILE = CACHE_DIR / "schemaorg-index.marshal"
+# Bump when the index layout changes so cached indexes are rebuilt
+INDEX_VERSION = 1
+
+# Prefixes that Schema.org term ids appear with in the various releases
+SCHEMA_PREFIXES = ("schema:", "https://schema.org/", "http://schema.org/")
+
+
+def schema_name(term_id: str) -> Optional[str]:
+    """Schema.org term name of an id such as 'schema:Person', else None."""
+    for prefix in SCHEMA_PREFIXES:
+        if term_id.startswith(prefix):
+            return term_id[len(prefix):]
+    return None
+
+
+def referenced_names(value) -> List[str]:
+    """Schema.org names referenced by a {'@id': ...} value or list of them."""
+    refs = value if isinstance(value, list) else [value] if value else []
+    names = []
+    for ref in refs:
+        name = schema_name(ref.get("@id", "")) if isinstance(ref, dict) else None
+        if name:
+            names.append(name)
+    return names
+
+
+def build_index(data: bytes, digest: str) -> Dict:
+    """Compile a JSON-LD vocabulary graph into the bitmask index."""
+    parents: Dict[str, List[str]] = {}
+    domain_names: Dict[str, List[str]] = {}
+    range_names: Dict[str, List[str]] = {}
+    for node in json.loads(data).get("@graph", []):
+        name = schema_name(node.get("@id", ""))
+        if not name:
+            continue
+        node_types = node.get("@type")
+        node_types = node_types if isinstance(node_types, list) else [node_types]
+        if "rdfs:Class" in node_types:
+            parents[name] = referenced_names(node.get("rdfs:subClassOf"))
+        elif "rdf:Property" in node_types:
+            domain_names[name] = referenced_names(node.get("schema:domainIncludes"))
+            range_names[name] = referenced_names(node.get("schema:rangeIncludes"))
+
+    classes = sorted(parents)
+    class_ids = {name: i for i, name in enumerate(classes)}
+
+    # Subclass closure: a class's mask has its own bit and its ancestors'
+    ancestors: List[Optional[int]] = [None] * len(classes)
+
+    def closure(class_id: int) -> int:
+        if ancestors[class_id] is None:
+            ancestors[class_id] = 0  # guards against cycles
+            mask = 1 << class_id
+            for parent in parents[classes[class_id]]:
+                if parent in class_ids:
+                    mask |= closure(class_ids[parent])
+            ancestors[class_id] = mask
+        return ancestors[class_id]
+
+    for class_id in range(len(classes)):
+        closure(class_id)
+
+    # Descendants of each class (itself included), by inverting the closure
+    descendants = [0] * len(classes)
+    for class_id, mask in enumerate(ancestors):
+        ancestor = 0
+        while mask:
+            if mask & 1:
+                descendants[ancestor] |= 1 << class_id
+            mask >>= 1
+            ancestor += 1
+
+    def expand(names: Iterable[str]) -> int:
+        mask = 0
+        for name in names:
+            if name in class_ids:
+                mask |= descendants[class_ids[name]]
+        return mask
+
+    return {
+        "version": INDEX_VERSION,
+        "digest": digest,
+        "classes": tuple(classes),
+        "ancestors": tuple(ancestors),
+        "domains": {name: expand(names) for name, names in domain_names.items()},
+        "ranges": {name: expand(names) for name, names in range_names.items()},
+        "range_names": {name: tuple(names) for name, names in range_names.items()},
+    }
+
+
+class Vocabulary:
+    """Subclass-closure and property-domain index of a Schema.org vocabulary."""
+
+    def __init__(self, index: Dict):
+        self.digest: str = index["digest"]
+        self.classes: Tuple[str, ...] = index["classes"]
+        self.class_ids = {name: i for i, name in enumerate(self.classes)}
+        self.ancestors: Tuple[int, ...] = index["ancestors"]
+        self.domains: Dict[str, int] = index["domains"]
+        self.ranges: Dict[str, int] = index["ranges"]
+        self.range_names: Dict[str, Tuple[str, ...]] = index["range_names"]
+
+    def is_type(self, name: str) -> bool:
+        """Whether the vocabulary defines a class of that name."""
+        return name in self.class_ids
+
+    def is_property(self, name: str) -> bool:
+        """Whether the vocabulary defines a property of that name."""
+        return name in self.domains
+
+    def is_subtype(self, name: str, parent: str) -> bool:
+        """Whether `name` is `parent` or one of its subclasses."""
+        class_id = self.class_ids.get(name)
+        parent_id = self.class_ids.get(parent)
+        if class_id is None or parent_id is None:
+            return False
+        return bool(self.ancestors[class_id] >> parent_id & 1)
+
+    def type_mask(self, names: Iterable[str]) -> int:
+        """Bitmask of the known classes among `names`."""
+        mask = 0
+        for name in names:
+            class_id = self.class_ids.get(name)
+            if class_id is not None:
+                mask |= 1 << class_id
+        return mask
+
+    def property_valid(self, name: str, types: Iterable[str]) -> bool:
+        """Whether a property may be used on an object of any of `types`."""
+        return bool(self.domains.get(name, 0) & self.type_mask(types))
+
+    def in_range(self, name: str, types: Iterable[str]) -> bool:
+        """Whether an object of any of `types` is a valid value of a property."""
+        return bool(self.ranges.get(name, 0) & self.type_mask(types))
+
+
+def load_index(path: Path, cache_file: Path = INDEX_CACHE_FILE) -> Dict:
+    """The index of a vocabulary file, from the cache when it is current."""
+    with phase("read"):
+        data = path.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+
+    try:
+        with open(cache_file, "rb") as f:
+            index = marshal.load(f)
+        if index.get("version") == INDEX_VERSION and index.get("digest") == digest:
+            return index
+    except (OSError, EOFError, ValueError, TypeError, AttributeError):
+        pass
+
+    with phase("parse"):
+        index = build_index(data, digest)
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(cache_file, "wb") as f:
+        marshal.dump(index, f)
+    return index
+
+
+# Loaded vocabularies, by file
+_loaded: Dict[Path, Vocabulary] = {}
+
+
+def load_vocabulary(path: Path = VOCABULARY_FILE) -> Vocabulary:
+    """The indexed vocabulary of a JSON-LD file, loaded once per process."""
+    vocabulary = _loaded.get(path)
+    if vocabulary is None:
+        vocabulary = _loaded[path] = Vocabulary(load_index(path))
+    return vocabulary
@@ -1,243 +1,427 @@
 #!/usr/bin/env python3
 """
 Content Validation Script
-Validates publications.json and blog-index.json for correctness
+Validates the data/*.json files against declarative schemas of their shapes
+
+Each file is parsed once and checked by a validator compiled from its
+schema in DATA_SCHEMAS. Findings name the offending value by its JSON
+pointer (e.g. /3/links/0/url) within the file.
 """
 
+import argparse
 import json
+import re
 import sys
-from pathlib import Path
 from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from generate_sitemap import POSTS_DIR, default_permalink, read_front_matter
+from instrumentation import add_arguments, instrumented, phase
+
+# (level, pointer, message) sink that compiled validators report to
+Report = Callable[[str, str, str], None]
+
+TEXT = {"type": "string"}
+LINK = {
+    "type": "object",
+    "required": ["name", "url"],
+    "properties": {"name": TEXT, "url": {"type": "string", "format": "url"}},
+}
+NEWS_ITEM = {
+    "type": "object",
+    "required": ["date", "content"],
+    "properties": {"date": {"type": "string", "format": "month-year"}, "content": TEXT},
+}
+
+# Declarative shape of each data file. Every schema node has a type
+# ("object", "array", "string", "integer" or "boolean") and optionally:
+#   required / recommended: keys an object must (error) / should (warning) have
+#   properties: key -> schema of its value; other keys are reported as unknown
+#   items: schema of each item of an array
+#   unique: key whose value must not repeat across the objects of an array
+#   format: extra check on a string value, registered in FORMATS below
+DATA_SCHEMAS = {
+    "publications.json": {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "required": ["title", "authors", "venue", "year"],
+            "recommended": ["links", "image"],
+            "properties": {
+                "title": TEXT,
+                # Comma-separated, as rendered on the publications page
+                "authors": TEXT,
+                "venue": TEXT,
+                "year": {"type": "string", "format": "year"},
+                "links": {"type": "array", "items": LINK},
+                "image": {"type": "string", "format": "url"},
+                "highlighted": {"type": "boolean"},
+            },
+        },
+    },
+    "blog-index.json": {
+        "type": "object",
+        "required": ["posts"],
+        "properties": {
+            "posts": {
+                "type": "array",
+                "unique": "id",
+                "items": {
+                    "type": "object",
+                    "required": ["id", "title", "date", "author", "excerpt", "content"],
+                    "recommended": ["categories", "tags", "image"],
+                    "properties": {
+                        "id": TEXT,
+                        "title": TEXT,
+                        "date": {"type": "string", "format": "date"},
+                        "updated": {"type": "string", "format": "date"},
+                        "author": TEXT,
+                        "excerpt": TEXT,
+                        "content": {"type": "string", "format": "post-url"},
+                        "categories": {"type": "array", "items": TEXT},
+                        "tags": {"type": "array", "items": TEXT},
+                        "image": {"type": "string", "format": "asset"},
+                        "readingTime": {"type": "integer"},
+                        "featured": {"type": "boolean"},
+                        "status": TEXT,
+                    },
+                },
+            },
+            "categories": {
+                "type": "array",
+                "unique": "slug",
+                "items": {
+                    "type": "object",
+                    "required": ["name", "slug"],
+                    "properties": {"name": TEXT, "slug": TEXT, "description": TEXT},
+                },
+            },
+            "tags": {"type": "array", "items": TEXT},
+        },
+    },
+    "news.json": {"type": "array", "items": NEWS_ITEM},
+    "blog.json": {
+        "type": "array",
+        "unique": "slug",
+        "items": {
+            "type": "object",
+            "required": ["title", "slug", "date"],
+            "recommended": ["excerpt"],
+            "properties": {
+                "title": TEXT,
+                "slug": TEXT,
+                "date": {"type": "string", "format": "long-date"},
+                "excerpt": TEXT,
+                "category": TEXT,
+                "image": {"type": "string", "format": "url"},
+            },
+        },
+    },
+    "home_content.json": {
+        "type": "object",
+        "required": ["about", "news", "profile_image", "contact"],
+        "properties": {
+            "about": TEXT,
+            "news": {"type": "array", "items": NEWS_ITEM},
+            "profile_image": {"type": "string", "format": "asset"},
+            "contact": {
+                "type": "object",
+                "required": ["social"],
+                "properties": {
+                    "email": TEXT,
+                    "social": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "required": ["name", "url"],
+                            "properties": {
+                                "name": TEXT,
+                                "url": {"type": "string", "format": "url"},
+                                "icon": TEXT,
+                            },
+                        },
+                    },
+                },
+            },
+        },
+    },
+}
+
+# JSON type names of the Python values json.load produces
+JSON_TYPES = {str: "string", bool: "boolean", int: "integer", float: "number",
+              list: "array", dict: "object", type(None): "null"}
+
+
+class Site:
+    """The site around a data directory, for checks that look outside the file."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._permalinks: Optional[Set[str]] = None
+
+    def permalinks(self) -> Set[str]:
+        """URLs of the blog posts in blog/posts-md, read once."""
+        if self._permalinks is None:
+            self._permalinks = {
+                read_front_matter(post).get('permalink') or default_permalink(post)
+                for post in (self.root / POSTS_DIR).glob('*.md')
+            }
+        return self._permalinks
 
-def validate_json_syntax(filepath):
-    """Validate JSON syntax"""
+
+def check_date(value: str, site: Site) -> Optional[Tuple[str, str]]:
+    """YYYY-MM-DD dates."""
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            json.load(f)
-        return True, "Valid JSON syntax"
-    except json.JSONDecodeError as e:
-        return False, f"Invalid JSON: {e}"
-    except FileNotFoundError:
-        return False, f"File not found: {filepath}"
+        datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        return "error", "Invalid date format (should be YYYY-MM-DD)"
+    return None
 
-def validate_publications(filepath):
-    """Validate publications.json structure and content"""
-    errors = []
-    warnings = []
-    
+
+def check_long_date(value: str, site: Site) -> Optional[Tuple[str, str]]:
+    """Dates written out, e.g. 'November 15, 2024'."""
+    try:
+        datetime.strptime(value, '%B %d, %Y')
+    except ValueError:
+        return "error", "Invalid date format (should be e.g. 'November 15, 2024')"
+    return None
+
+
+def check_month_year(value: str, site: Site) -> Optional[Tuple[str, str]]:
+    """MM/YY news dates."""
+    try:
+        datetime.strptime(value, '%m/%y')
+    except ValueError:
+        return "error", "Invalid date format (should be MM/YY)"
+    return None
+
+
+def check_year(value: str, site: Site) -> Optional[Tuple[str, str]]:
+    """Four-digit years within a plausible range."""
+    if not re.fullmatch(r'\d{4}', value):
+        return "error", f"Invalid year '{value}' (should be YYYY)"
+    if not 1900 <= int(value) <= datetime.now().year + 2:
+        return "warning", f"Year {value} seems unusual"
+    return None
+
+
+def check_url(value: str, site: Site) -> Optional[Tuple[str, str]]:
+    """http(s) URLs with a dotted host, mailto: links, or root-relative paths."""
+    # Empty strings are placeholders, not broken links
+    if not value or value.startswith('mailto:'):
+        return None
+    if value.startswith('/') and not value.startswith('//'):
+        return None
+    try:
+        parts = urlsplit(value)
+        scheme, host = parts.scheme, parts.hostname or ''
+    except ValueError:  # e.g. an unbalanced [ in the host
+        scheme, host = '', ''
+    if scheme not in ('http', 'https') or '.' not in host.strip('.'):
+        return "error", (f"Invalid URL '{value}' "
+                         "(should be http(s) with a domain, or start with /)")
+    return None
+
+
+def check_asset(value: str, site: Site) -> Optional[Tuple[str, str]]:
+    """Site files referenced by path, which should exist."""
+    if value.startswith(('http://', 'https://')) or not value:
+        return None
+    if not (site.root / value.lstrip('/')).exists():
+        return "warning", f"File not found: {value}"
+    return None
+
+
+def check_post_url(value: str, site: Site) -> Optional[Tuple[str, str]]:
+    """Post URLs, which should be the permalink of a post in blog/posts-md."""
+    if value not in site.permalinks():
+        return "warning", f"Content file not found: {value}"
+    return None
+
+
+# Format name -> check(value, site) returning a (level, message) or None
+FORMATS = {
+    "date": check_date,
+    "long-date": check_long_date,
+    "month-year": check_month_year,
+    "year": check_year,
+    "url": check_url,
+    "asset": check_asset,
+    "post-url": check_post_url,
+}
+
+
+def pointer_token(key: str) -> str:
+    """Escape an object key for use in a JSON pointer (RFC 6901)."""
+    return key.replace('~', '~0').replace('/', '~1')
+
+
+def compile_schema(schema: Dict) -> Callable:
+    """Compile a schema node into validate(value, pointer, site, report).
+
+    Everything that does not depend on the value (child validators,
+    escaped pointer tokens, the format check) is resolved once here.
+    """
+    expected = schema["type"]
+    required = tuple(schema.get("required", ()))
+    recommended = tuple(schema.get("recommended", ()))
+    properties = {
+        key: ("/" + pointer_token(key), compile_schema(child))
+        for key, child in schema.get("properties", {}).items()
+    }
+    items = compile_schema(schema["items"]) if "items" in schema else None
+    unique = schema.get("unique")
+    check_format = FORMATS[schema["format"]] if "format" in schema else None
+
+    def validate(value: Any, pointer: str, site: Site, report: Report):
+        actual = JSON_TYPES.get(type(value), type(value).__name__)
+        if actual != expected:
+            report("error", pointer,
+                   f"must be {expected_article(expected)}, not {actual}")
+            return
+
+        if expected == "object":
+            for key in required:
+                if key not in value:
+                    report("error", pointer, f"Missing required field '{key}'")
+            for key in recommended:
+                if key not in value:
+                    report("warning", pointer, f"No '{key}' field provided")
+            for key, child in value.items():
+                entry = properties.get(key)
+                if entry is None:
+                    if properties:
+                        report("warning", pointer, f"Unknown field '{key}'")
+                    continue
+                token, validate_child = entry
+                validate_child(child, pointer + token, site, report)
+        elif expected == "array":
+            seen = set()
+            for index, item in enumerate(value):
+                item_pointer = f"{pointer}/{index}"
+                if items is not None:
+                    items(item, item_pointer, site, report)
+                if unique and isinstance(item, dict) and unique in item:
+                    key = item[unique]
+                    if key in seen:
+                        report("error", item_pointer, f"Duplicate {unique}: '{key}'")
+                    seen.add(key)
+        elif check_format is not None:
+            finding = check_format(value, site)
+            if finding:
+                report(finding[0], pointer, finding[1])
+
+    return validate
+
+
+def expected_article(type_name: str) -> str:
+    """'an array', 'a string', ..."""
+    return f"an {type_name}" if type_name[0] in "aeiou" else f"a {type_name}"
+
+
+# Compiled validators, by data file name
+_validators: Dict[str, Callable] = {}
+
+
+def validator_for(name: str) -> Callable:
+    """The compiled validator of a data file, compiling it on first use."""
+    validator = _validators.get(name)
+    if validator is None:
+        validator = _validators[name] = compile_schema(DATA_SCHEMAS[name])
+    return validator
+
+
+def load_data_file(filepath: Path) -> Tuple[Any, Optional[str]]:
+    """Parse a data file once; returns (data, None) or (None, error message)."""
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    except Exception as e:
-        return [f"Cannot read file: {e}"], []
-    
-    # Check required top-level keys
-    if 'publications' not in data:
-        errors.append("Missing 'publications' array")
-        return errors, warnings
-    
-    publications = data['publications']
-    
-    # Validate each publication
-    for idx, pub in enumerate(publications):
-        pub_id = pub.get('id', f'publication_{idx}')
-        
-        # Required fields
-        required_fields = ['id', 'title', 'authors', 'venue', 'year']
-        for field in required_fields:
-            if field not in pub:
-                errors.append(f"Publication '{pub_id}': Missing required field '{field}'")
-        
-        # Validate authors is a list
-        if 'authors' in pub and not isinstance(pub['authors'], list):
-            errors.append(f"Publication '{pub_id}': 'authors' must be an array")
-        
-        # Validate year is a number
-        if 'year' in pub and not isinstance(pub['year'], int):
-            errors.append(f"Publication '{pub_id}': 'year' must be a number")
-        
-        # Validate year is reasonable
-        if 'year' in pub and isinstance(pub['year'], int):
-            current_year = datetime.now().year
-            if pub['year'] < 1900 or pub['year'] > current_year + 2:
-                warnings.append(f"Publication '{pub_id}': Year {pub['year']} seems unusual")
-        
-        # Check for links
-        if 'links' in pub:
-            if not isinstance(pub['links'], dict):
-                errors.append(f"Publication '{pub_id}': 'links' must be an object")
-        else:
-            warnings.append(f"Publication '{pub_id}': No 'links' field provided")
-        
-        # Check for image
-        if 'image' not in pub:
-            warnings.append(f"Publication '{pub_id}': No 'image' field provided")
-        
-        # Check for bibtex
-        if 'bibtex' not in pub:
-            warnings.append(f"Publication '{pub_id}': No 'bibtex' field provided")
-        
-        # Check for abstract
-        if 'abstract' not in pub:
-            warnings.append(f"Publication '{pub_id}': No 'abstract' field provided")
-    
-    return errors, warnings
+            return json.load(f), None
+    except FileNotFoundError:
+        return None, f"File not found: {filepath}"
+    except json.JSONDecodeError as e:
+        return None, f"Invalid JSON at line {e.lineno}, column {e.colno}: {e.msg}"
+    except (OSError, UnicodeDecodeError) as e:
+        return None, f"Cannot read file: {e}"
 
-def validate_blog_index(filepath):
-    """Validate blog-index.json structure and content"""
+
+def validate_data(name: str, data: Any, site: Site) -> Tuple[List[str], List[str]]:
+    """Errors and warnings of a parsed data file, each prefixed by its JSON pointer."""
     errors = []
     warnings = []
-    
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    except Exception as e:
-        return [f"Cannot read file: {e}"], []
-    
-    # Check required top-level keys
-    if 'posts' not in data:
-        errors.append("Missing 'posts' array")
-        return errors, warnings
-    
-    posts = data['posts']
-    post_ids = set()
-    
-    # Validate each post
-    for idx, post in enumerate(posts):
-        post_id = post.get('id', f'post_{idx}')
-        
-        # Check for duplicate IDs
-        if post_id in post_ids:
-            errors.append(f"Duplicate post ID: '{post_id}'")
-        post_ids.add(post_id)
-        
-        # Required fields
-        required_fields = ['id', 'title', 'date', 'author', 'excerpt', 'content']
-        for field in required_fields:
-            if field not in post:
-                errors.append(f"Post '{post_id}': Missing required field '{field}'")
-        
-        # Validate date format
-        if 'date' in post:
-            try:
-                datetime.strptime(post['date'], '%Y-%m-%d')
-            except ValueError:
-                errors.append(f"Post '{post_id}': Invalid date format (should be YYYY-MM-DD)")
-        
-        # Validate content path
-        if 'content' in post:
-            content_path = Path(post['content'])
-            if not content_path.is_absolute():
-                # Check if file exists relative to root
-                full_path = Path(__file__).parent.parent / post['content'].lstrip('/')
-                if not full_path.exists():
-                    warnings.append(f"Post '{post_id}': Content file not found: {post['content']}")
-        
-        # Check for categories
-        if 'categories' in post:
-            if not isinstance(post['categories'], list):
-                errors.append(f"Post '{post_id}': 'categories' must be an array")
-        else:
-            warnings.append(f"Post '{post_id}': No 'categories' field provided")
-        
-        # Check for tags
-        if 'tags' in post:
-            if not isinstance(post['tags'], list):
-                errors.append(f"Post '{post_id}': 'tags' must be an array")
-        else:
-            warnings.append(f"Post '{post_id}': No 'tags' field provided")
-        
-        # Check for image
-        if 'image' not in post:
-            warnings.append(f"Post '{post_id}': No 'image' field provided")
-    
-    # Validate categories
-    if 'categories' in data:
-        if not isinstance(data['categories'], list):
-            errors.append("'categories' must be an array")
-        else:
-            for cat in data['categories']:
-                if 'name' not in cat or 'slug' not in cat:
-                    errors.append(f"Category missing 'name' or 'slug': {cat}")
-    
-    # Validate tags
-    if 'tags' in data:
-        if not isinstance(data['tags'], list):
-            errors.append("'tags' must be an array")
-    
+
+    def report(level: str, pointer: str, message: str):
+        findings = errors if level == "error" else warnings
+        findings.append(f"{pointer or '(document)'}: {message}")
+
+    validator_for(name)(data, "", site, report)
     return errors, warnings
 
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Validate site data files")
+    parser.add_argument(
+        "--data-dir",
+        type=Path,
+        default=Path(__file__).parent.parent / 'data',
+        help=f"Directory holding the data files ({', '.join(DATA_SCHEMAS)})",
+    )
+    add_arguments(parser)
+    return parser.parse_args()
+
 def main():
     """Main validation function"""
+    args = parse_args()
+    with instrumented(args, "validate-content"):
+        return validate_data_dir(args.data_dir)
+
+def validate_data_dir(base_path):
+    """Validate every data file in a directory and print the results"""
     print("=" * 70)
     print("Content Validation Script")
     print("=" * 70)
     print()
-    
-    base_path = Path(__file__).parent.parent / 'data'
-    publications_path = base_path / 'publications.json'
-    blog_index_path = base_path / 'blog-index.json'
-    
+
+    site = Site(base_path.parent)
     all_errors = []
     all_warnings = []
-    
-    # Validate publications.json
-    print("Validating publications.json...")
-    print("-" * 70)
-    
-    valid, msg = validate_json_syntax(publications_path)
-    if not valid:
-        print(f"❌ {msg}")
-        all_errors.append(msg)
-    else:
-        print(f"✅ {msg}")
-        errors, warnings = validate_publications(publications_path)
-        all_errors.extend(errors)
-        all_warnings.extend(warnings)
-        
-        if errors:
-            print(f"\n❌ Found {len(errors)} error(s):")
-            for error in errors:
-                print(f"   - {error}")
-        else:
-            print("✅ No errors found")
-        
-        if warnings:
-            print(f"\n⚠️  Found {len(warnings)} warning(s):")
-            for warning in warnings:
-                print(f"   - {warning}")
-    
-    print()
-    
-    # Validate blog-index.json
-    print("Validating blog-index.json...")
-    print("-" * 70)
-    
-    valid, msg = validate_json_syntax(blog_index_path)
-    if not valid:
-        print(f"❌ {msg}")
-        all_errors.append(msg)
-    else:
-        print(f"✅ {msg}")
-        errors, warnings = validate_blog_index(blog_index_path)
+
+    for name in DATA_SCHEMAS:
+        print(f"Validating {name}...")
+        print("-" * 70)
+
+        with phase("read"):
+            data, msg = load_data_file(base_path / name)
+        if msg:
+            print(f"❌ {msg}")
+            all_errors.append(msg)
+            print()
+            continue
+
+        print("✅ Valid JSON syntax")
+        with phase("check"):
+            errors, warnings = validate_data(name, data, site)
         all_errors.extend(errors)
         all_warnings.extend(warnings)
-        
+
         if errors:
             print(f"\n❌ Found {len(errors)} error(s):")
             for error in errors:
                 print(f"   - {error}")
         else:
             print("✅ No errors found")
-        
+
         if warnings:
             print(f"\n⚠️  Found {len(warnings)} warning(s):")
             for warning in warnings:
                 print(f"   - {warning}")
-    
-    print()
+
+        print()
+
     print("=" * 70)
-    
+
     # Summary
     if all_errors:
         print(f"❌ Validation failed with {len(all_errors)} error(s)")
@@ -15,189 +15,460 @@ Usage:
     uv run python scripts/validate_schema.py _site/index.html
 """
 
+import argparse
+import hashlib
 import json
-import re
 import sys
+from collections import defaultdict
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from html_document import (
+    FragmentCache,
+    HtmlDocument,
+    JsonLdBlock,
+    find_json_ld,
+    source_position,
+)
+from instrumentation import add_arguments, instrumented, phase
+from schema_vocabulary import (
+    SCHEMAORG_VERSION, VOCABULARY_FILE, Vocabulary, load_vocabulary,
+)
+
+# Bump when the validation rules change so cached results are not reused
+CHECKER_VERSION = "6"
+
+# Declarative validation rules per @type (per Google's guidelines):
+#   required: fields the object must have (errors)
+#   recommended: fields top-level objects should have (warnings)
+#   fields: field name -> (check, argument, level, message) rules run on
+#     the field's value; checks are registered in FIELD_CHECKS below
+# Objects nested in any field are validated with the rules of their own
+# @type, so e.g. a BlogPosting's author is checked as a Person. Every object
+# is also checked against the Schema.org vocabulary: unknown @types,
+# properties used on types outside their domain, and nested objects whose
+# type is outside the property's range are reported as warnings.
+SCHEMA_RULES = {
+    "Person": {
+        "required": ["@type", "name"],
+        "recommended": [
+            "image", "jobTitle", "url", "description", "knowsAbout", "sameAs",
+        ],
+        "fields": {
+            "image": [
+                ("keys", ["width", "height"], "warning",
+                 "Person image should include width and height"),
+                ("not_string", None, "warning",
+                 "Person image should be ImageObject with dimensions"),
+            ],
+            "worksFor": [
+                ("keys", ["url"], "warning",
+                 "worksFor organization should include URL"),
+            ],
+            "alumniOf": [
+                ("subtype_of", "EducationalOrganization", "warning",
+                 "alumniOf should be an EducationalOrganization "
+                 "such as CollegeOrUniversity"),
+            ],
+        },
+    },
+    "BlogPosting": {
+        "required": ["@type", "headline", "datePublished", "author"],
+        "recommended": ["image", "publisher", "dateModified", "description"],
+        "fields": {
+            # A typed author or publisher is validated with its own type's rules
+            # (e.g. a Person without a name is warned about); an untyped one is
+            # not, so it is flagged here whether or not it has a name
+            "author": [
+                ("keys", ["@type"], "warning",
+                 "BlogPosting author should have @type and name"),
+            ],
+            "publisher": [
+                ("keys", ["@type"], "warning",
+                 "BlogPosting publisher should have @type and name"),
+            ],
+        },
+    },
+    "WebSite": {
+        "required": ["@type", "name", "url"],
+        "recommended": ["description", "author"],
+    },
+    "BreadcrumbList": {
+        "required": ["@type", "itemListElement"],
+        "fields": {
+            "itemListElement": [
+                ("min_items", 1, "warning",
+                 "BreadcrumbList should have at least one item"),
+                ("item_keys", ["position", "name"], "error",
+                 "BreadcrumbList item {index} missing {key}"),
+            ],
+        },
+    },
+    "PodcastSeries": {"required": ["@type", "name", "url"]},
+    "CollectionPage": {"required": ["@type", "name", "url"]},
+    "Blog": {"required": ["@type", "name", "url"]},
+    "ProfilePage": {"required": ["@type", "name", "url"]},
+    "ContactPage": {"required": ["@type", "name", "url"]},
+    "Organization": {"required": ["@type", "name"]},
+    "CollegeOrUniversity": {"required": ["@type", "name"]},
+}
+
+# (level, message) sink that validators report to. Messages are suffixes
+# of the final text, which starts with the name of the block on its page.
+Report = Callable[[str, str], None]
+
+# Distinct JSON-LD blocks whose findings are kept for reuse
+BLOCK_CACHE_SIZE = 1024
+
+
+class BlockResult(NamedTuple):
+    """Outcome of validating one distinct JSON-LD block."""
+    digest: str  # canonical content hash
+    valid: bool
+    findings: Tuple[Tuple[str, str], ...]  # (level, message suffix)
+
+
+def as_items(value) -> list:
+    """A field value as a list of values (single values become one item)."""
+    return value if isinstance(value, list) else [value]
+
+
+def check_keys(keys, level, message):
+    """Every nested object in the field has all of `keys`."""
+    def check(value, where, report):
+        for item in as_items(value):
+            if isinstance(item, dict) and any(key not in item for key in keys):
+                report(level, f"{where}: {message}")
+    return check
+
+
+def check_not_string(_, level, message):
+    """The field is an object rather than a plain string."""
+    def check(value, where, report):
+        if isinstance(value, str):
+            report(level, f"{where}: {message}")
+    return check
+
+
+def check_subtype_of(parent, level, message):
+    """Every typed object in the field is a `parent` or one of its subtypes."""
+    def check(value, where, report):
+        for item in as_items(value):
+            if isinstance(item, dict) and "@type" in item and not any(
+                vocabulary().is_subtype(name, parent)
+                for name in type_key(item["@type"])
+            ):
+                report(level, f"{where}: {message}")
+    return check
+
+
+def check_min_items(count, level, message):
+    """The field is a list with at least `count` items."""
+    def check(value, where, report):
+        if not isinstance(value, list) or len(value) < count:
+            report(level, f"{where}: {message}")
+    return check
+
+
+def check_item_keys(keys, level, message):
+    """Every item of a list field has all of `keys`."""
+    def check(value, where, report):
+        if not isinstance(value, list):
+            return
+        for index, item in enumerate(value):
+            for key in keys:
+                if not isinstance(item, dict) or key not in item:
+                    report(level, f"{where}: {message.format(index=index, key=key)}")
+    return check
+
+
+# Check name used in SCHEMA_RULES -> factory building the check
+FIELD_CHECKS = {
+    "keys": check_keys,
+    "not_string": check_not_string,
+    "subtype_of": check_subtype_of,
+    "min_items": check_min_items,
+    "item_keys": check_item_keys,
+}
+
+
+def type_key(schema_type) -> Tuple[str, ...]:
+    """Hashable form of an @type value, which may be a list of types."""
+    if isinstance(schema_type, list):
+        return tuple(str(name) for name in schema_type)
+    return (str(schema_type),)
+
+
+def compile_validator(types: Tuple[str, ...]) -> Callable:
+    """Compile the rules of one @type (or @type list) into a validator.
+
+    The validator walks an object once: it checks the required and
+    recommended fields, runs the field rules, checks each property against
+    the vocabulary and validates nested typed objects with their own
+    compiled validators.
+    """
+    vocab = vocabulary()
+    unknown_types = [name for name in types if not vocab.is_type(name)]
+    rules = [SCHEMA_RULES[name] for name in types if name in SCHEMA_RULES]
+    type_name = ", ".join(types)
+    has_required = any("required" in rule for rule in rules)
+    required = list(dict.fromkeys(
+        field for rule in rules for field in rule.get("required", ())
+    ))
+    recommended = list(dict.fromkeys(
+        field for rule in rules for field in rule.get("recommended", ())
+    ))
+    field_checks = defaultdict(list)
+    for rule in rules:
+        for field, checks in rule.get("fields", {}).items():
+            for check, argument, level, message in checks:
+                compiled = FIELD_CHECKS[check](argument, level, message)
+                field_checks[field].append(compiled)
+
+    # Property name -> vocabulary problem (None when fine), filled on first use
+    property_problems: Dict[str, Optional[str]] = {}
+
+    def property_problem(field: str) -> Optional[str]:
+        if field.startswith("@") or len(unknown_types) == len(types):
+            return None
+        if not vocab.is_property(field):
+            return f"Unknown property '{field}' (not in {_vocabulary_name})"
+        if not vocab.property_valid(field, types):
+            return f"'{field}' is not a property of {type_name}"
+        return None
+
+    def validate(schema: Dict[str, Any], report: Report,
+                 path: Optional[str] = None) -> bool:
+        """Validate an object; nested objects pass their field path."""
+        label = f"{path}: {type_name}" if path else type_name
+        # Top-level messages name the block only, nested ones the path too
+        where = f" ({label})" if path else ""
+        is_valid = True
+
+        if has_required:
+            missing = ", ".join(field for field in required if field not in schema)
+            if missing and path:
+                # Nested objects were only ever warned about, so they still are
+                report("warning", f" ({label}): Missing required fields: {missing}")
+            elif missing:
+                report("error", f" ({label}): Missing required fields: {missing}")
+                is_valid = False
+            elif not path:
+                report("success", f" ({label}): All required fields present ✓")
+
+        if recommended and not path:
+            missing = ", ".join(field for field in recommended if field not in schema)
+            if missing:
+                report("warning", f" ({label}): Missing recommended fields: {missing}")
+
+        for unknown in unknown_types:
+            report("warning",
+                   f" ({label}): Unknown @type '{unknown}' (not in {_vocabulary_name})")
+
+        for field, value in schema.items():
+            if field not in property_problems:
+                property_problems[field] = property_problem(field)
+            if property_problems[field]:
+                report("warning", f" ({label}): {property_problems[field]}")
+            for check in field_checks.get(field, ()):
+                check(value, where, report)
+            for item in as_items(value):
+                if isinstance(item, dict) and "@type" in item:
+                    item_types = type_key(item["@type"])
+                    if (vocab.is_property(field) and vocab.type_mask(item_types)
+                            and not vocab.in_range(field, item_types)):
+                        expected = " or ".join(vocab.range_names[field])
+                        report("warning", (
+                            f" ({label}): '{field}' should be "
+                            f"{expected}, not {', '.join(item_types)}"
+                        ))
+                    nested = validator_for(item["@type"])
+                    if not nested(item, report, f"{path or type_name}.{field}"):
+                        is_valid = False
+
+        return is_valid
+
+    return validate
+
+
+# Compiled validators, memoized by @type
+_validators: Dict[Tuple[str, ...], Callable] = {}
+_vocabulary: Optional[Vocabulary] = None
+# How warnings name the vocabulary, which may predate a newer term
+_vocabulary_name = f"Schema.org {SCHEMAORG_VERSION}"
+
+
+def vocabulary() -> Vocabulary:
+    """The Schema.org vocabulary the validators check against."""
+    global _vocabulary
+    if _vocabulary is None:
+        _vocabulary = load_vocabulary()
+    return _vocabulary
+
+
+def use_vocabulary(path: Path):
+    """Validate against another vocabulary file (e.g. a newer Schema.org release)."""
+    global _vocabulary, _vocabulary_name, _block_results
+    _vocabulary = load_vocabulary(path)
+    if path != VOCABULARY_FILE:
+        _vocabulary_name = path.name
+    _validators.clear()
+    _block_results = FragmentCache(BLOCK_CACHE_SIZE)
+
+
+def validate_block(schema: Any, report: Report) -> bool:
+    """Validate a decoded JSON-LD block, including @graph members."""
+    # A block may be a top-level array or an @graph of objects
+    if isinstance(schema, list) or (isinstance(schema, dict) and "@graph" in schema):
+        is_valid = True
+        items = schema if isinstance(schema, list) else schema["@graph"]
+        for item in as_items(items):
+            if not validate_block(item, report):
+                is_valid = False
+        return is_valid
+
+    if not isinstance(schema, dict) or not schema.get("@type"):
+        report("error", ": Missing @type field")
+        return False
+
+    return validator_for(schema["@type"])(schema, report)
+
+
+# Raw block text -> canonical digest, and canonical digest -> BlockResult.
+# Site-wide blocks (e.g. the WebSite block from base.njk) are validated
+# once and their findings are reused on every page carrying them.
+_block_digests = FragmentCache(BLOCK_CACHE_SIZE)
+_block_results = FragmentCache(BLOCK_CACHE_SIZE)
+
+
+def canonical_digest(schema: Any) -> str:
+    """Hash of a decoded block, independent of key order and whitespace."""
+    canonical = json.dumps(
+        schema, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def json_ld_error(source: str, block: JsonLdBlock, error: json.JSONDecodeError) -> str:
+    """Message for a block that is not valid JSON, at its line and column."""
+    line, column = source_position(source, block.offset + error.pos)
+    return f"Invalid JSON-LD at line {line}, column {column}: {error.msg}"
+
+
+def validated_block(raw: str) -> BlockResult:
+    """Validate a raw JSON-LD block, once per distinct content.
+
+    Raises json.JSONDecodeError, with positions relative to `raw`, when
+    the block is not valid JSON.
+    """
+    text = raw.strip()
+    digest = _block_digests.get(text)
+    result = _block_results.get(digest) if digest else None
+    if result is not None:
+        return result
+
+    schema = json.loads(raw)
+    digest = canonical_digest(schema)
+    _block_digests.put(text, digest)
+    result = _block_results.get(digest)
+    if result is None:
+        findings = []
+        valid = validate_block(
+            schema, lambda level, message: findings.append((level, message))
+        )
+        result = BlockResult(digest, valid, tuple(findings))
+        _block_results.put(digest, result)
+    return result
+
+
+def validator_for(schema_type) -> Callable:
+    """The compiled validator for an @type, compiling it on first use."""
+    key = type_key(schema_type)
+    validator = _validators.get(key)
+    if validator is None:
+        validator = _validators[key] = compile_validator(key)
+    return validator
 
 
 class SchemaValidator:
     """Validator for Schema.org structured data."""
     
-    # Required fields for different schema types per Google's guidelines
-    REQUIRED_FIELDS = {
-        "Person": ["@type", "name"],
-        "BlogPosting": ["@type", "headline", "datePublished", "author"],
-        "WebSite": ["@type", "name", "url"],
-        "BreadcrumbList": ["@type", "itemListElement"],
-        "PodcastSeries": ["@type", "name", "url"],
-        "CollectionPage": ["@type", "name", "url"],
-        "Blog": ["@type", "name", "url"],
-        "ProfilePage": ["@type", "name", "url"],
-        "ContactPage": ["@type", "name", "url"],
-    }
-    
-    # Recommended fields for rich results
-    RECOMMENDED_FIELDS = {
-        "Person": ["image", "jobTitle", "url", "description", "knowsAbout", "sameAs"],
-        "BlogPosting": ["image", "publisher", "dateModified", "description"],
-        "WebSite": ["description", "author"],
-    }
-    
     def __init__(self):
         self.errors = []
         self.warnings = []
         self.successes = []
+        # JSON-LD blocks seen, and the distinct contents among them
+        self.blocks = 0
+        self.distinct_blocks = set()
     
     def extract_json_ld(self, html_content: str) -> List[Dict[str, Any]]:
         """Extract all JSON-LD scripts from HTML content."""
-        pattern = r'<script\s+type="application/ld\+json"[^>]*>(.*?)</script>'
-        matches = re.findall(pattern, html_content, re.DOTALL)
-        
+        return self.decode_json_ld(find_json_ld(html_content), html_content)
+    
+    def decode_json_ld(self, blocks: List[JsonLdBlock],
+                       source: str) -> List[Dict[str, Any]]:
+        """Decode located JSON-LD blocks, recording invalid ones as errors."""
         json_ld_objects = []
-        for match in matches:
+        for block in blocks:
             try:
-                # Clean up the JSON string
-                json_str = match.strip()
-                obj = json.loads(json_str)
-                json_ld_objects.append(obj)
+                json_ld_objects.append(json.loads(block.text))
             except json.JSONDecodeError as e:
-                self.errors.append(f"Invalid JSON-LD: {e}")
+                self.errors.append(json_ld_error(source, block, e))
         
         return json_ld_objects
     
-    def validate_schema(self, schema: Dict[str, Any], schema_name: str = "Unknown") -> bool:
-        """Validate a single schema object."""
-        is_valid = True
-        
-        # Handle @graph structures
-        if "@graph" in schema:
-            for item in schema["@graph"]:
-                if not self.validate_schema(item, schema_name):
-                    is_valid = False
-            return is_valid
-        
-        schema_type = schema.get("@type")
-        if not schema_type:
-            self.errors.append(f"{schema_name}: Missing @type field")
-            return False
-        
-        # Check required fields
-        if schema_type in self.REQUIRED_FIELDS:
-            required = self.REQUIRED_FIELDS[schema_type]
-            missing = [field for field in required if field not in schema]
-            
-            if missing:
-                self.errors.append(
-                    f"{schema_name} ({schema_type}): Missing required fields: {', '.join(missing)}"
-                )
-                is_valid = False
-            else:
-                self.successes.append(
-                    f"{schema_name} ({schema_type}): All required fields present ✓"
-                )
-        
-        # Check recommended fields
-        if schema_type in self.RECOMMENDED_FIELDS:
-            recommended = self.RECOMMENDED_FIELDS[schema_type]
-            missing = [field for field in recommended if field not in schema]
-            
-            if missing:
-                self.warnings.append(
-                    f"{schema_name} ({schema_type}): Missing recommended fields: {', '.join(missing)}"
-                )
-        
-        # Validate specific fields
-        self._validate_specific_fields(schema, schema_type, schema_name)
-        
-        return is_valid
+    def report(self, level: str, message: str):
+        """Record a message from a compiled validator."""
+        if level == "error":
+            self.errors.append(message)
+        elif level == "warning":
+            self.warnings.append(message)
+        else:
+            self.successes.append(message)
     
-    def _validate_specific_fields(self, schema: Dict[str, Any], schema_type: str, schema_name: str):
-        """Validate specific field requirements."""
-        
-        # Person schema validations
-        if schema_type == "Person":
-            # Check image
-            if "image" in schema:
-                image = schema["image"]
-                if isinstance(image, dict):
-                    if "width" not in image or "height" not in image:
-                        self.warnings.append(
-                            f"{schema_name}: Person image should include width and height"
-                        )
-                elif isinstance(image, str):
-                    self.warnings.append(
-                        f"{schema_name}: Person image should be ImageObject with dimensions"
-                    )
-            
-            # Check worksFor
-            if "worksFor" in schema:
-                works_for = schema["worksFor"]
-                if isinstance(works_for, dict) and "url" not in works_for:
-                    self.warnings.append(
-                        f"{schema_name}: worksFor organization should include URL"
-                    )
-            
-            # Check alumniOf
-            if "alumniOf" in schema:
-                alumni = schema["alumniOf"]
-                if isinstance(alumni, list):
-                    for edu in alumni:
-                        if edu.get("@type") == "Organization":
-                            self.warnings.append(
-                                f"{schema_name}: alumniOf should use CollegeOrUniversity instead of Organization"
-                            )
-        
-        # BlogPosting validations
-        elif schema_type == "BlogPosting":
-            # Check author
-            if "author" in schema:
-                author = schema["author"]
-                if isinstance(author, dict):
-                    if "@type" not in author or "name" not in author:
-                        self.warnings.append(
-                            f"{schema_name}: BlogPosting author should have @type and name"
-                        )
-        
-        # BreadcrumbList validations
-        elif schema_type == "BreadcrumbList":
-            if "itemListElement" in schema:
-                items = schema["itemListElement"]
-                if not isinstance(items, list) or len(items) == 0:
-                    self.warnings.append(
-                        f"{schema_name}: BreadcrumbList should have at least one item"
-                    )
-                else:
-                    for i, item in enumerate(items):
-                        if "position" not in item:
-                            self.errors.append(
-                                f"{schema_name}: BreadcrumbList item {i} missing position"
-                            )
-                        if "name" not in item:
-                            self.errors.append(
-                                f"{schema_name}: BreadcrumbList item {i} missing name"
-                            )
+    def validate_schema(self, schema: Any, schema_name: str = "Unknown") -> bool:
+        """Validate a single decoded JSON-LD block, including @graph members."""
+        return validate_block(
+            schema, lambda level, message: self.report(level, schema_name + message)
+        )
     
     def validate_file(self, file_path: Path) -> bool:
         """Validate structured data in an HTML file."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            with phase("read"):
+                source = file_path.read_text(encoding='utf-8')
         except Exception as e:
             self.errors.append(f"Error reading {file_path}: {e}")
             return False
-        
-        schemas = self.extract_json_ld(content)
+        return self.validate_source(source, file_path)
+    
+    def validate_document(self, document: HtmlDocument) -> bool:
+        """Validate structured data in an already-parsed HTML document."""
+        return self.validate_source(document.source, document.path)
+    
+    def validate_source(self, source: str, file_path: Path) -> bool:
+        """Validate the JSON-LD blocks located in a page's source."""
+        schemas = []
+        for block in find_json_ld(source):
+            try:
+                schemas.append(validated_block(block.text))
+            except json.JSONDecodeError as e:
+                # Reported ahead of the valid blocks, which alone are numbered
+                message = json_ld_error(source, block, e)
+                self.errors.append(f"{file_path.name}: {message}")
         
         if not schemas:
             self.warnings.append(f"{file_path.name}: No structured data found")
             return True  # Not an error, just no schema
         
         is_valid = True
-        for i, schema in enumerate(schemas):
+        for i, result in enumerate(schemas):
             schema_name = f"{file_path.name} (schema {i+1})"
-            if not self.validate_schema(schema, schema_name):
+            self.blocks += 1
+            self.distinct_blocks.add(result.digest)
+            for level, message in result.findings:
+                self.report(level, schema_name + message)
+            if not result.valid:
                 is_valid = False
         
         return is_valid
@@ -227,48 +498,83 @@ class SchemaValidator:
                 print(f"  ✗ {error}")
         
         print("\n" + "="*80)
-        print(f"SUMMARY: {len(self.successes)} passed, {len(self.warnings)} warnings, {len(self.errors)} errors")
+        print(f"SUMMARY: {len(self.successes)} passed, "
+              f"{len(self.warnings)} warnings, {len(self.errors)} errors")
+        if self.blocks:
+            print(f"🔁 {self.blocks} JSON-LD blocks, "
+                  f"{len(self.distinct_blocks)} distinct")
         print("="*80 + "\n")
         
         # Google Rich Results Test reminder
         print("📝 Next Steps:")
-        print("  1. Test with Google Rich Results: https://search.google.com/test/rich-results")
+        print("  1. Test with Google Rich Results: "
+              "https://search.google.com/test/rich-results")
         print("  2. Validate with Schema.org: https://validator.schema.org/")
         print("  3. Check Search Console for indexed structured data")
         print()
 
 
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Validate Schema.org structured data in HTML files"
+    )
+    parser.add_argument("path", nargs="?", type=Path, help="HTML file or directory")
+    parser.add_argument(
+        "--vocabulary",
+        type=Path,
+        default=VOCABULARY_FILE,
+        help="Schema.org vocabulary in JSON-LD release format "
+             f"(default: the vendored {VOCABULARY_FILE.name})",
+    )
+    add_arguments(parser)
+    return parser.parse_args()
+
+
 def main():
     """Main entry point."""
-    if len(sys.argv) < 2:
+    args = parse_args()
+    if args.path is None:
         print("Usage: uv run python scripts/validate_schema.py <path>")
         print("\nExamples:")
         print("  uv run python scripts/validate_schema.py _site/")
         print("  uv run python scripts/validate_schema.py _site/index.html")
         sys.exit(1)
     
-    path = Path(sys.argv[1])
+    with instrumented(args, "validate_schema"):
+        use_vocabulary(args.vocabulary)
+        validator = validate_path(args.path)
+        
+        with phase("report"):
+            validator.print_report()
+    
+    # Exit with error code if there are errors
+    sys.exit(1 if validator.errors else 0)
+
+
+def validate_path(path: Path) -> SchemaValidator:
+    """Validate a single HTML file or every HTML file under a directory."""
     validator = SchemaValidator()
     
     if path.is_file():
         # Validate single file
         print(f"Validating {path}...")
-        validator.validate_file(path)
+        with phase("check"):
+            validator.validate_file(path)
     elif path.is_dir():
         # Validate all HTML files in directory
-        html_files = list(path.rglob("*.html"))
+        with phase("discover"):
+            html_files = list(path.rglob("*.html"))
         print(f"Found {len(html_files)} HTML files to validate...")
         
         for html_file in sorted(html_files):
-            validator.validate_file(html_file)
+            with phase("check"):
+                validator.validate_file(html_file)
     else:
         print(f"Error: {path} is not a valid file or directory")
         sys.exit(1)
     
-    validator.print_report()
-    
-    # Exit with error code if there are errors
-    sys.exit(1 if validator.errors else 0)
+    return validator
 
 
 if __name__ == "__main__":
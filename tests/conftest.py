@@ -0,0 +1,12 @@
+"""
+Shared pytest setup for the scripts/ tooling.
+
+The scripts import each other as siblings (they run as
+`python scripts/X.py`), so scripts/ is put on sys.path here.
+"""
+
+import sys
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
@@ -0,0 +1,55 @@
+"""Tests that audit.py's cache and process pool do not change its results."""
+
+import json
+
+from audit import run_audit
+
+PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head><title>Post {number}</title>
+<script type="application/ld+json">
+{{"@context": "https://schema.org", "@type": "BlogPosting", "headline": "Post {number}",
+  "datePublished": "2024-01-0{number}T00:00:00Z", "author": {{"name": "Itzik"}}}}
+</script>
+</head>
+<body>
+<nav><a href="/">Home</a><img src="/logo.png"></nav>
+<main id="main"><h1>Post {number}</h1><h{level}>Section</h{level}>
+<a href="#missing-{number}">Broken fragment</a><input id="q{number}"></main>
+<footer><p>Footer</p></footer>
+</body>
+</html>
+"""
+
+
+def write_site(root, count=6):
+    """Pages with accessibility, heading and structured data findings."""
+    site = root / "_site"
+    site.mkdir()
+    files = []
+    for number in range(1, count + 1):
+        path = site / f"post-{number}.html"
+        source = PAGE.format(number=number, level=2 + number % 3)
+        path.write_text(source, encoding='utf-8')
+        files.append(path)
+    return files
+
+
+def comparable(results):
+    """Results as the JSON the audit cache stores, so tuples compare as lists."""
+    return json.loads(json.dumps(results, default=str))
+
+
+def test_cached_and_parallel_results_match_serial(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    files = write_site(tmp_path)
+    serial = comparable(run_audit(files, jobs=1, use_cache=False))
+    assert any(result['accessibility']['issues'] for result in serial)
+    assert any(result['headings'][1] for result in serial)
+    assert any(result['schema'][1] for result in serial)
+
+    assert comparable(run_audit(files, jobs=3, use_cache=False)) == serial
+    # A cold run fills .cache/audit.sqlite, a warm one is answered from it
+    assert comparable(run_audit(files, jobs=3, use_cache=True)) == serial
+    assert (tmp_path / ".cache" / "audit.sqlite").exists()
+    assert comparable(run_audit(files, jobs=1, use_cache=True)) == serial
@@ -0,0 +1,61 @@
+"""Tests for the tag-rule accessibility checker in check_accessibility.py."""
+
+from check_accessibility import check_document
+from html_document import parse_document
+
+PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head><title>{title}</title><meta name="viewport" content="width=device-width"></head>
+<body>
+<a href="#main" class="skip-link">Skip to main content</a>
+<nav><a href="#">Menu</a><img src="/logo.png"></nav>
+<main id="main"><h1>{title}</h1></main>
+</body>
+</html>
+"""
+
+
+def test_merged_chrome_issues_are_not_shared_between_pages():
+    first = check_document(parse_document(PAGE.format(title="First")))
+    nav_issues = [issue for issue in first['issues'] if issue['rule'] == 'img-alt']
+    assert nav_issues
+
+    # Changing one page's findings must not reach the cached nav fragment
+    for issue in first['issues']:
+        issue['message'] = 'changed'
+
+    second = check_document(parse_document(PAGE.format(title="Second")))
+    assert 'changed' not in [issue['message'] for issue in second['issues']]
+    assert [issue['rule'] for issue in second['issues']] == [
+        issue['rule'] for issue in first['issues']
+    ]
+
+
+def input_label_issues(body):
+    """input-label messages for a page whose <main> holds `body`."""
+    source = PAGE.format(title="Form").replace("<h1>Form</h1>", "<h1>Form</h1>" + body)
+    issues = check_document(parse_document(source))['issues']
+    return [issue['message'] for issue in issues if issue['rule'] == 'input-label']
+
+
+def test_input_with_only_an_id_needs_a_label():
+    assert input_label_issues('<input id="q" type="search">') == [
+        "Input field has no <label for> or aria-label: id=q, type=search"
+    ]
+
+
+def test_labelled_inputs_pass():
+    assert input_label_issues(
+        '<label for="q">Search</label><input id="q" type="search">'
+        '<input id="late"><label for="late">Declared after the input</label>'
+        '<label>Name <input type="text"></label>'
+        '<input type="text" aria-label="Email">'
+        '<span id="hint">Hint</span><input type="text" aria-labelledby="hint">'
+        '<input type="hidden">'
+    ) == []
+
+
+def test_input_without_id_or_label():
+    assert input_label_issues('<input type="text">') == [
+        "Input field missing id or aria-label: type=text"
+    ]
@@ -0,0 +1,61 @@
+"""Tests for the content-hash lastmod dates in generate_sitemap.py."""
+
+from datetime import datetime
+
+import generate_sitemap
+from generate_sitemap import (
+    build_content_dates,
+    hash_rendered_page,
+    hash_rendered_pages,
+)
+
+GIT_DATE = "2020-01-01"
+
+
+def make_site(root, count):
+    """Rendered pages with sources whose git date is GIT_DATE."""
+    site = root / "_site"
+    pages = []
+    for number in range(count):
+        url = f"/post-{number}/"
+        (site / url.strip('/')).mkdir(parents=True)
+        (site / url.strip('/') / "index.html").write_text(
+            f"<html><body><p>Post {number}</p></body></html>", encoding='utf-8'
+        )
+        pages.append({'url': url, 'source': f"post-{number}.md", 'priority': "0.7"})
+    git_dates = {page['source']: GIT_DATE for page in pages}
+    return site, pages, git_dates
+
+
+def test_content_dates_only_move_when_output_changes(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        generate_sitemap, 'CONTENT_MANIFEST_FILE', tmp_path / ".cache" / "content.json"
+    )
+    monkeypatch.setattr(generate_sitemap, 'CACHE_DIR', tmp_path / ".cache")
+    site, pages, git_dates = make_site(tmp_path, 3)
+
+    first = build_content_dates(pages, git_dates, site)
+    assert first == {page['url']: GIT_DATE for page in pages}
+    assert build_content_dates(pages, git_dates, site) == first
+
+    # Whitespace churn keeps the date; a real change moves it to the build date
+    changed = site / "post-1" / "index.html"
+    changed.write_text("<html><body><p>Post\n  1</p></body></html>\n")
+    assert build_content_dates(pages, git_dates, site) == first
+    changed.write_text("<html><body><p>Post 1, edited</p></body></html>")
+    build_date = datetime.now().strftime("%Y-%m-%d")
+    assert build_content_dates(pages, git_dates, site)["/post-1/"] == build_date
+
+    # A dropped page leaves the manifest, so it starts over if it comes back
+    build_content_dates(pages[:2], git_dates, site)
+    assert build_content_dates(pages, git_dates, site)["/post-2/"] == GIT_DATE
+
+
+def test_parallel_hashing_matches_serial(tmp_path, monkeypatch):
+    site, pages, _ = make_site(tmp_path, 8)
+    paths = [str(site / page['url'].strip('/') / "index.html") for page in pages]
+    paths.append(str(site / "missing.html"))
+    monkeypatch.setattr(generate_sitemap, 'PARALLEL_HASH_THRESHOLD', 2)
+
+    assert hash_rendered_pages(paths) == [hash_rendered_page(path) for path in paths]
+    assert hash_rendered_pages(paths)[-1] is None
@@ -0,0 +1,44 @@
+"""Tests for the chrome fragment replay in html_document.py."""
+
+import html_document
+from html_document import FragmentCache, parse_document
+
+PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head><title>{title}</title></head>
+<body>
+<nav aria-labelledby="nav-title"><h2 id="nav-title">Menu</h2>
+<ul><li><a href="#main">Skip</a></li>
+<li><a name="top" href="/about/">About</a></li></ul>
+<label for="search">Search</label><input id="search" type="search">
+</nav>
+<main id="main"><h1>{title}</h1><p>{body}</p><h3 id="detail">Detail</h3></main>
+<footer><h2>Contact</h2><a href="#detail">Back to detail</a></footer>
+</body>
+</html>
+"""
+
+
+def snapshot(document):
+    """Everything the checkers read from a parsed document."""
+    return (
+        document.tags, document.text, document.headings, document.title,
+        document.ids, document.anchor_names, document.references, document.fragments,
+    )
+
+
+def test_replayed_chrome_matches_a_full_parse(monkeypatch):
+    monkeypatch.setattr(html_document, '_fragments', FragmentCache())
+    parse_document(PAGE.format(title="First", body="Warms the fragment cache"))
+
+    # A longer title shifts the chrome, so replayed offsets must be rebased
+    source = PAGE.format(title="A much longer second title", body="Replayed")
+    replayed = parse_document(source)
+    assert len(replayed.fragments) == 2
+    cached = html_document._fragments
+    assert all(cached.get(digest) for _, _, digest in replayed.fragments)
+
+    # A cache that keeps nothing forces every subtree to be tokenized
+    monkeypatch.setattr(html_document, '_fragments', FragmentCache(size=0))
+    parsed = parse_document(source)
+    assert snapshot(replayed) == snapshot(parsed)
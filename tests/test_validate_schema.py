@@ -0,0 +1,61 @@
+"""Tests for the compiled Schema.org validators in validate_schema.py."""
+
+import pytest
+
+from validate_schema import validate_block
+
+
+def findings(block):
+    """(level, message) pairs reported for a block, successes left out."""
+    reported = []
+    valid = validate_block(
+        block, lambda level, message: reported.append((level, message))
+    )
+    return valid, [pair for pair in reported if pair[0] != "success"]
+
+
+def blog_posting(author):
+    """A BlogPosting with every required and recommended field but author."""
+    return {
+        "@type": "BlogPosting",
+        "headline": "Title",
+        "datePublished": "2024-01-01T00:00:00Z",
+        "dateModified": "2024-01-01T00:00:00Z",
+        "description": "Description",
+        "image": "https://www.itzikbs.com/image.png",
+        "publisher": {"@type": "Person", "name": "Itzik Ben-Shabat"},
+        "author": author,
+    }
+
+
+@pytest.mark.parametrize("author, expected", [
+    # Untyped authors are flagged by the BlogPosting author rule
+    ({"name": "Itzik"}, "BlogPosting author should have @type and name"),
+    ({}, "BlogPosting author should have @type and name"),
+    # Typed ones by their own type's required fields
+    (
+        {"@type": "Person"},
+        "(BlogPosting.author: Person): Missing required fields: name",
+    ),
+])
+def test_incomplete_author_is_one_warning(author, expected):
+    valid, reported = findings(blog_posting(author))
+    assert valid
+    assert len(reported) == 1
+    level, message = reported[0]
+    assert level == "warning"
+    assert expected in message
+
+
+def test_complete_author_is_clean():
+    valid, reported = findings(blog_posting({"@type": "Person", "name": "Itzik"}))
+    assert valid
+    assert reported == []
+
+
+def test_top_level_missing_required_field_is_error():
+    block = blog_posting({"@type": "Person", "name": "Itzik"})
+    del block["headline"]
+    valid, reported = findings(block)
+    assert not valid
+    assert ("error", " (BlogPosting): Missing required fields: headline") in reported